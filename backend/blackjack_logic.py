@@ -78,8 +78,10 @@ def create_new_game(player_ids: list[str], game_mode: str = "best_of_5"):
             hands[pid]['status'] = "stood"
             game_state['log'].append(f"{pid} has Blackjack!")
             
-    # Check if all players are done
-    if all(p['status'] != 'playing' for p in hands.values()):
+    # Start with the first player who still has to act; if Blackjacks
+    # left nobody, go straight to the dealer
+    _skip_finished_players(game_state)
+    if game_state['current_turn_index'] == len(player_ids):
         game_state = _run_dealer_turn(game_state)
         game_state = _calculate_winners(game_state)
     
@@ -119,9 +121,9 @@ def play_move(game_state: dict, player_id: str, move_data: dict):
     else:
         raise ValueError("Invalid action. Must be 'hit' or 'stand'.")
 
-    # If the current player is done, move to the next.
-    if player_state['status'] != 'playing':
-        game_state['current_turn_index'] += 1
+    # If the current player is done, move to the next one still playing
+    # (anyone dealt a Blackjack has already stood).
+    _skip_finished_players(game_state)
     
     # If all players have had their turn
     if game_state['current_turn_index'] == len(game_state['players']):
@@ -132,6 +134,15 @@ def play_move(game_state: dict, player_id: str, move_data: dict):
     return game_state
 
 # --- Internal "Engine" Functions ---
+def _skip_finished_players(game_state: dict):
+    """Moves current_turn_index past players who have stood or busted."""
+    players = game_state['players']
+    hands = game_state['hands']
+    index = game_state['current_turn_index']
+    while index < len(players) and hands[players[index]]['status'] != 'playing':
+        index += 1
+    game_state['current_turn_index'] = index
+
 def _run_dealer_turn(game_state: dict):
     dealer_hand = game_state['dealer_hand']
     game_state['dealer_value'] = calculate_hand_value(dealer_hand)
@@ -2,15 +2,38 @@
 import random
 from collections import deque
 
-def create_boneyard(max_pips=6):
-    boneyard = [(i, j) for i in range(max_pips + 1) for j in range(i, max_pips + 1)]
-    random.shuffle(boneyard)
-    return boneyard
+# --- Constants ---
+# Tuples are immutable, so every game can share the same 28 tile objects
+_BONEYARD_TEMPLATE = tuple((i, j) for i in range(7) for j in range(i, 7))
 
-def create_new_game(player_ids: list[str], game_mode: str = "classic"):
+# Wire strings are decoded once per move; the engine compares int codes
+ACTION_PASS, ACTION_DRAW, ACTION_PLAY = range(3)
+SIDE_LEFT, SIDE_RIGHT = range(2)
+MODE_CLASSIC, MODE_BORICUA = range(2)
+_ACTIONS = {"pass": ACTION_PASS, "draw": ACTION_DRAW, "play": ACTION_PLAY}
+_SIDES = {"left": SIDE_LEFT, "right": SIDE_RIGHT}
+_MODES = {"classic": MODE_CLASSIC, "boricua": MODE_BORICUA}
+
+# Boricua points for winning hands 1-4 (index 0 unused); later hands are worth 25
+_HAND_POINTS = (0, 100, 75, 50, 25)
+
+def create_boneyard(max_pips=6, rng=random):
+    if max_pips == 6:
+        template = _BONEYARD_TEMPLATE
+    else:
+        template = tuple((i, j) for i in range(max_pips + 1) for j in range(i, max_pips + 1))
+    # sample() returns a freshly shuffled list without rebuilding the tiles
+    return rng.sample(template, len(template))
+
+def create_new_game(player_ids: list[str], game_mode: str = "classic", log_enabled: bool = True, rng=random,
+                    starting_players: list[str] = None):
     """
     Sets up a new game, deals hands, and finds the starting player.
     game_mode: "classic" (best of 5, no prizes) or "boricua" (first to 500, with prizes)
+    log_enabled: False skips building log messages (e.g. for AI simulations)
+    rng: source for the shuffle; pass a seeded random.Random for reproducible deals
+    starting_players: only these players may start (e.g. the team that wins a
+    deadlock tie); defaults to everyone
     """
     if not 2 <= len(player_ids) <= 4:
         raise ValueError("Dominoes must have 2 to 4 players.")
@@ -18,47 +41,49 @@ def create_new_game(player_ids: list[str], game_mode: str = "classic"):
     if game_mode == "boricua" and len(player_ids) != 4:
         raise ValueError("Boricua style requires exactly 4 players (2v2).")
         
-    boneyard = create_boneyard()
+    boneyard = create_boneyard(rng=rng)
     hands = {player_id: [] for player_id in player_ids}
     
-    # Deal 7 tiles each
+    # Deal 7 tiles each. As each tile lands, record which eligible starter
+    # holds each double and who holds the highest-pip tile (fallback when
+    # nobody has a double); pip ties go to the earlier player, as if
+    # scanning hands in seat order.
+    can_start = set(starting_players or player_ids)
+    doubles_seat = {}
+    max_pips = -1
+    max_pips_seat = len(player_ids)
+    hand_pip_sum = {player_id: 0 for player_id in player_ids}
     for _ in range(7):
-        for player_id in player_ids:
+        for seat, player_id in enumerate(player_ids):
             if not boneyard:
                 break
-            hands[player_id].append(boneyard.pop())
+            tile = boneyard.pop()
+            hands[player_id].append(tile)
+            a, b = tile
+            hand_pip_sum[player_id] += a + b
+            if player_id not in can_start:
+                continue
+            if a == b:
+                doubles_seat[a] = seat
+            if a + b > max_pips or (a + b == max_pips and seat < max_pips_seat):
+                max_pips = a + b
+                max_pips_seat = seat
 
-    # Check if we need to use a specific starter from previous hand (deadlock tie)
-    start_player_id = None
+    # Seats are tracked instead of IDs so the turn index needs no list search
+    start_seat = None
     start_tile = None
-    
-    # If next_hand_starter is set (from deadlock tie), use that team's first player
-    if game_mode == "boricua" and teams:
-        # This will be set when creating next hand after deadlock tie
-        # For now, find normally
-        pass
-    
+
     # Find starting player (highest double)
-    if not start_player_id:
-        for double in range(6, -1, -1):
-            tile = (double, double)
-            for player_id, hand in hands.items():
-                if tile in hand:
-                    start_player_id = player_id
-                    start_tile = tile
-                    break
-            if start_player_id:
-                break
+    for double in range(6, -1, -1):
+        if double in doubles_seat:
+            start_seat = doubles_seat[double]
+            start_tile = (double, double)
+            break
 
-    # If no double, find highest pip tile
-    if not start_player_id:
-        max_pips = -1
-        for player_id, hand in hands.items():
-            for tile in hand:
-                if sum(tile) > max_pips:
-                    max_pips = sum(tile)
-                    start_player_id = player_id
-        start_tile = None 
+    # If no double, use the highest pip tile
+    if start_seat is None:
+        start_seat = max_pips_seat
+    start_player_id = player_ids[start_seat]
 
     # Initialize scoring
     scores = {player_id: 0 for player_id in player_ids}
@@ -67,85 +92,207 @@ def create_new_game(player_ids: list[str], game_mode: str = "classic"):
     
     # For Boricua style, organize teams (first 2 vs last 2)
     teams = None
+    player_to_team = None
     if game_mode == "boricua":
         teams = {
             "team1": player_ids[:2],
             "team2": player_ids[2:]
         }
         team_scores = {"team1": 0, "team2": 0}
+        # Reverse index so scoring doesn't scan the teams on every hand end
+        player_to_team = {pid: team for team, team_players in teams.items() for pid in team_players}
 
     game_state = {
-        "board": [], # A list for easier JSON/Mongo storage
+        "board": [], # A list for easier JSON/Mongo storage (a deque won't encode; max 28 tiles)
         "hands": hands,
         "boneyard": boneyard,
         "players": player_ids,
-        "current_turn_index": player_ids.index(start_player_id),
+        "current_turn_index": start_seat,
         "status": "in_progress",
         "last_move_was_capicu": False,
         "last_tile_played": None,
+        "left_end": None,  # Open pips, kept in sync with the board on every play
+        "right_end": None,
         "passes_in_a_row": 0,
+        # Running aggregates so the deadlock check never rescans hands or board
+        "hand_pip_sum": hand_pip_sum,
+        "fives_on_board": 0,
         "winner": None,
         "game_mode": game_mode,
         "scores": scores,
         "hand_wins": hand_wins,
         "hand_number": hand_number,
         "teams": teams,
+        "player_to_team": player_to_team,
         "team_scores": team_scores if game_mode == "boricua" else None,
         "starting_player_id": start_player_id,  # Track who started this hand
-        "log": [f"Game started ({game_mode.upper()} mode). {start_player_id} goes first."]
+        "log_enabled": log_enabled,
+        "log": [f"Game started ({game_mode.upper()} mode). {start_player_id} goes first."] if log_enabled else []
     }
 
     # If a starting double was found, play it automatically
     if start_tile:
-        game_state['board'].append(start_tile)
-        game_state['hands'][start_player_id].remove(start_tile)
-        game_state['current_turn_index'] = (game_state['current_turn_index'] + 1) % len(player_ids)
-        game_state['last_tile_played'] = start_tile
-        game_state['log'].append(f"{start_player_id} started with {start_tile}.")
+        place_starting_tile(game_state, start_player_id, start_tile)
+        if log_enabled:
+            game_state['log'].append(f"{start_player_id} started with {start_tile}.")
         
     return game_state
 
+def place_starting_tile(game_state: dict, player_id: str, tile: tuple):
+    """
+    Opens an empty board with tile from player_id's hand and passes the turn.
+    current_turn_index must already point at player_id.
+    """
+    game_state['board'].append(tile)
+    game_state['hands'][player_id].remove(tile)
+    game_state['hand_pip_sum'][player_id] -= tile[0] + tile[1]
+    if 5 in tile:
+        game_state['fives_on_board'] += 1
+    game_state['left_end'], game_state['right_end'] = tile
+    game_state['current_turn_index'] = (game_state['current_turn_index'] + 1) % len(game_state['players'])
+    game_state['last_tile_played'] = tile
+
 def get_open_ends(board: list):
     if not board:
         return None, None
     return board[0][0], board[-1][1]
 
+def fill_missing_fields(game_state: dict):
+    """
+    Brings a state saved by an older version up to date by deriving the
+    running fields it predates from the board. States that already
+    have them are left as they are.
+    """
+    if 'left_end' not in game_state:
+        game_state['left_end'], game_state['right_end'] = get_open_ends(game_state['board'])
+    if 'hand_pip_sum' not in game_state:
+        game_state['hand_pip_sum'] = {
+            player_id: sum(a + b for a, b in hand) for player_id, hand in game_state['hands'].items()
+        }
+    if 'player_to_team' not in game_state:
+        teams = game_state.get('teams')
+        game_state['player_to_team'] = (
+            {pid: team for team, team_players in teams.items() for pid in team_players} if teams else None
+        )
+    if 'fives_on_board' not in game_state:
+        game_state['fives_on_board'] = sum(1 for tile in game_state['board'] if 5 in tile)
+
+def _decode_action(move_data: dict):
+    """Maps the move's 'action' and 'side' strings to codes (None if unknown)."""
+    return _ACTIONS.get(move_data.get('action')), _SIDES.get(move_data.get('side'))
+
+def _place_tile(a: int, b: int, side, left_end, right_end):
+    """
+    Pure placement rule for tile (a, b) against the open ends (None on an
+    empty board). No dicts or logging, so it can be run in bulk or compiled.
+    Returns (placed_tile, at_left, new_left_end, new_right_end).
+    """
+    if left_end is None:
+        return (a, b), False, a, b
+    if side == SIDE_LEFT:
+        if b == left_end: return (a, b), True, a, right_end
+        if a == left_end: return (b, a), True, b, right_end
+        raise ValueError("Tile doesn't match the left end.")
+    if side == SIDE_RIGHT:
+        if a == right_end: return (a, b), False, left_end, b
+        if b == right_end: return (b, a), False, left_end, a
+        raise ValueError("Tile doesn't match the right end.")
+    raise ValueError("Side must be 'left' or 'right'.")
+
+def _team_points(hand_pip_sum: dict, team_players: list):
+    """Total pips left in the hands of a team's players."""
+    return sum([hand_pip_sum[player_id] for player_id in team_players])
+
+def _award_deadlock(game_state: dict, team1_points: int, team2_points: int, log):
+    """Scores a Boricua deadlock: the team with the fewest pips left takes them all."""
+    teams = game_state['teams']
+    team_scores = game_state['team_scores']
+    
+    if log: log(f"🔒 DEADLOCK! All 5s are out, both ends are 5/5.")
+    
+    if team1_points == team2_points:
+        # Tie - nobody wins, team who started starts next round
+        if log: log(f"🤝 TIE! Both teams have {team1_points} points. Nobody wins.")
+        
+        # Find which team started (use starting_player_id from game state)
+        starting_player_id = game_state.get('starting_player_id')
+        if not starting_player_id:
+            # Fallback: use first player if not tracked
+            starting_player_id = game_state['players'][0]
+        
+        starting_team = game_state['player_to_team'].get(starting_player_id, "team2")
+        if log: log(f"🔄 {starting_team.upper()} started this hand, so they start the next round.")
+        game_state['next_hand_starter'] = starting_team  # Track for next hand
+        _finalize_hand(game_state, None, log)
+        return
+    
+    # Least points wins
+    if team1_points < team2_points:
+        winner, winner_points, loser_points = "team1", team1_points, team2_points
+    else:
+        winner, winner_points, loser_points = "team2", team2_points, team1_points
+    points_awarded = team1_points + team2_points
+    team_scores[winner] += points_awarded
+    if log: log(f"🏆 {winner.upper()} WINS (least points: {winner_points} vs {loser_points}) - {points_awarded} POINTS!")
+    if log: log(f"📊 SCORES: {teams['team1']} = {team_scores['team1']} | {teams['team2']} = {team_scores['team2']}")
+    _finalize_hand(game_state, winner, log)
+
+def _finalize_hand(game_state: dict, winning_team, log):
+    """
+    Ends a Boricua hand after scoring: the game is over once winning_team
+    reaches 500, otherwise everyone waits for the next hand.
+    winning_team is None for a tied deadlock.
+    """
+    if winning_team and game_state['team_scores'][winning_team] >= 500:
+        game_state['status'] = "finished"
+        game_state['winner'] = winning_team
+        if log: log(f"🎊🎊🎊 {winning_team.upper()} WINS THE GAME! 🎊🎊🎊")
+        return
+    
+    # Start new hand - wait for all players to be ready
+    game_state['status'] = "hand_finished"
+    game_state['winner'] = winning_team
+    game_state['hand_number'] += 1
+    game_state['ready_for_next_hand'] = {}  # Track who's ready: {player_id: True}
+    if log: log(f"🏆 Hand {game_state['hand_number'] - 1} complete! All players must click 'Next Hand' to continue.")
+
 def play_move(game_state: dict, player_id: str, move_data: dict):
     """
     Takes the current game state and a move, validates it,
     and returns the new game state.
     """
     
+    # Bind the hot lookups once; the containers are mutated in place
+    players = game_state['players']
+    hands = game_state['hands']
+    board = game_state['board']
+    boneyard = game_state['boneyard']
+    
     turn_index = game_state['current_turn_index']
-    turn_player_id = game_state['players'][turn_index]
+    turn_player_id = players[turn_index]
     
     if player_id != turn_player_id:
         raise ValueError("It's not your turn.")
     
-    action = move_data.get('action')
-    hand = game_state['hands'][player_id]
+    action, side = _decode_action(move_data)
+    mode = _MODES.get(game_state.get('game_mode', 'classic'))
+    hand = hands[player_id]
+    # Bound only when logging is on, so simulations skip the f-string work
+    log = game_state['log'].append if game_state.get('log_enabled', True) else None
 
-    if action == "pass":
-        if game_state['boneyard']:
+    if action == ACTION_PASS:
+        if boneyard:
             raise ValueError("You must draw from the boneyard, not pass.")
         
         game_state['passes_in_a_row'] += 1
-        game_state['log'].append(f"{player_id} passed.")
+        if log: log(f"{player_id} passed.")
 
-        if game_state['passes_in_a_row'] >= len(game_state['players']):
+        if game_state['passes_in_a_row'] >= len(players):
             # Game is blocked - check for deadlock in Boricua style
-            game_mode = game_state.get('game_mode', 'classic')
-            
-            if game_mode == "boricua":
+            if mode == MODE_BORICUA:
                 # Check for deadlock: all 7 tiles with 5 are out, both ends are 5/5
-                board = game_state['board']
-                left_end, right_end = get_open_ends(board)
-                
-                # Count how many tiles with 5 are on the board
-                tiles_with_5_on_board = sum(1 for tile in board if 5 in tile)
-                
-                # Check if deadlock condition: both ends are 5, and all 7 tiles with 5 are out
-                is_deadlock = (left_end == 5 and right_end == 5 and tiles_with_5_on_board == 7)
+                is_deadlock = (game_state['left_end'] == 5 and game_state['right_end'] == 5 and
+                               game_state['fives_on_board'] == 7)
                 
                 if is_deadlock:
                     # Deadlock! Calculate points for each team
@@ -154,214 +301,122 @@ def play_move(game_state: dict, player_id: str, move_data: dict):
                     
                     if teams and team_scores:
                         # Calculate points in hand for each team
-                        team1_points = sum(sum(tile) for player_id in teams['team1'] for tile in game_state['hands'][player_id])
-                        team2_points = sum(sum(tile) for player_id in teams['team2'] for tile in game_state['hands'][player_id])
-                        
-                        if team1_points < team2_points:
-                            # Team 1 wins (least points)
-                            points_awarded = team1_points + team2_points
-                            team_scores['team1'] += points_awarded
-                            game_state['log'].append(f"🔒 DEADLOCK! All 5s are out, both ends are 5/5.")
-                            game_state['log'].append(f"🏆 TEAM1 WINS (least points: {team1_points} vs {team2_points}) - {points_awarded} POINTS!")
-                            game_state['log'].append(f"📊 SCORES: {teams['team1']} = {team_scores['team1']} | {teams['team2']} = {team_scores['team2']}")
-                            
-                            # Check if team reached 500
-                            if team_scores['team1'] >= 500:
-                                game_state['status'] = "finished"
-                                game_state['winner'] = "team1"
-                                game_state['log'].append(f"🎊🎊🎊 TEAM1 WINS THE GAME! 🎊🎊🎊")
-                            else:
-                                game_state['status'] = "hand_finished"
-                                game_state['winner'] = "team1"
-                                game_state['hand_number'] += 1
-                                game_state['ready_for_next_hand'] = {}
-                                game_state['log'].append(f"🏆 Hand {game_state['hand_number'] - 1} complete! All players must click 'Next Hand' to continue.")
-                        elif team2_points < team1_points:
-                            # Team 2 wins (least points)
-                            points_awarded = team1_points + team2_points
-                            team_scores['team2'] += points_awarded
-                            game_state['log'].append(f"🔒 DEADLOCK! All 5s are out, both ends are 5/5.")
-                            game_state['log'].append(f"🏆 TEAM2 WINS (least points: {team2_points} vs {team1_points}) - {points_awarded} POINTS!")
-                            game_state['log'].append(f"📊 SCORES: {teams['team1']} = {team_scores['team1']} | {teams['team2']} = {team_scores['team2']}")
-                            
-                            # Check if team reached 500
-                            if team_scores['team2'] >= 500:
-                                game_state['status'] = "finished"
-                                game_state['winner'] = "team2"
-                                game_state['log'].append(f"🎊🎊🎊 TEAM2 WINS THE GAME! 🎊🎊🎊")
-                            else:
-                                game_state['status'] = "hand_finished"
-                                game_state['winner'] = "team2"
-                                game_state['hand_number'] += 1
-                                game_state['ready_for_next_hand'] = {}
-                                game_state['log'].append(f"🏆 Hand {game_state['hand_number'] - 1} complete! All players must click 'Next Hand' to continue.")
-                        else:
-                            # Tie - nobody wins, team who started starts next round
-                            game_state['log'].append(f"🔒 DEADLOCK! All 5s are out, both ends are 5/5.")
-                            game_state['log'].append(f"🤝 TIE! Both teams have {team1_points} points. Nobody wins.")
-                            
-                            # Find which team started (use starting_player_id from game state)
-                            starting_player_id = game_state.get('starting_player_id')
-                            if not starting_player_id:
-                                # Fallback: use first player if not tracked
-                                starting_player_id = game_state['players'][0]
-                            
-                            # Determine which team started
-                            starting_team = None
-                            if starting_player_id in teams['team1']:
-                                starting_team = "team1"
-                            else:
-                                starting_team = "team2"
-                            
-                            game_state['log'].append(f"🔄 {starting_team.upper()} started this hand, so they start the next round.")
-                            
-                            game_state['status'] = "hand_finished"
-                            game_state['winner'] = None
-                            game_state['hand_number'] += 1
-                            game_state['ready_for_next_hand'] = {}
-                            game_state['next_hand_starter'] = starting_team  # Track for next hand
-                            game_state['log'].append(f"🏆 Hand {game_state['hand_number'] - 1} complete! All players must click 'Next Hand' to continue.")
+                        hand_pip_sum = game_state['hand_pip_sum']
+                        team1_points = _team_points(hand_pip_sum, teams['team1'])
+                        team2_points = _team_points(hand_pip_sum, teams['team2'])
+                        _award_deadlock(game_state, team1_points, team2_points, log)
                 else:
                     # Regular block (not deadlock) - handle normally
                     game_state['status'] = "finished"
                     game_state['winner'] = "blocked"
-                    game_state['log'].append("Game is blocked!")
+                    if log: log("Game is blocked!")
             else:
                 # Classic mode - handle normally
                 game_state['status'] = "finished"
                 game_state['winner'] = "blocked"
-                game_state['log'].append("Game is blocked!")
+                if log: log("Game is blocked!")
         
-    elif action == "draw":
-        if not game_state['boneyard']:
+    elif action == ACTION_DRAW:
+        if not boneyard:
             raise ValueError("Boneyard is empty, you must pass.")
             
-        new_tile = game_state['boneyard'].pop()
+        new_tile = boneyard.pop()
         hand.append(new_tile)
-        game_state['log'].append(f"{player_id} drew a tile.")
+        game_state['hand_pip_sum'][player_id] += new_tile[0] + new_tile[1]
+        if log: log(f"{player_id} drew a tile.")
         
-    elif action == "play":
+    elif action == ACTION_PLAY:
         tile = tuple(move_data.get('tile')) # e.g., [6, 5] -> (6, 5)
-        side = move_data.get('side') # 'left' or 'right'
         
-        # Find the actual tile in hand (handle both tuples and lists)
-        actual_tile = None
-        for hand_tile in hand:
-            # Normalize both for comparison
-            norm_hand_tile = tuple(hand_tile) if isinstance(hand_tile, list) else hand_tile
-            if tile == norm_hand_tile or tile == tuple(reversed(norm_hand_tile)):
-                actual_tile = hand_tile
-                # Use normalized version for playing
-                tile = norm_hand_tile if tile == norm_hand_tile else tuple(reversed(norm_hand_tile))
+        # Find the tile in hand in either orientation. Unpacking compares pips
+        # directly, so it works for tuples and for lists loaded from Mongo.
+        a, b = tile
+        tile_index = None
+        for i, (x, y) in enumerate(hand):
+            if (x == a and y == b) or (x == b and y == a):
+                tile_index = i
                 break
         
-        if actual_tile is None:
+        if tile_index is None:
             raise ValueError("You don't have that tile.")
         
-        board = game_state['board']
-        left_end, right_end = get_open_ends(board)
+        # Validate the placement before touching the state
+        placed_tile, at_left, new_left, new_right = _place_tile(
+            a, b, side, game_state['left_end'], game_state['right_end'])
         
         game_state['passes_in_a_row'] = 0
-        hand.remove(actual_tile)  # Remove the actual tile from hand
+        del hand[tile_index]  # Remove the matched tile without a second scan
+        game_state['hand_pip_sum'][player_id] -= a + b
+        if a == 5 or b == 5:
+            game_state['fives_on_board'] += 1
         game_state['last_tile_played'] = tile
 
-        if not board:
-            board.append(tile)
-        elif side == 'left':
-            if tile[1] == left_end: board.insert(0, tile)
-            elif tile[0] == left_end: board.insert(0, (tile[1], tile[0]))
-            else: raise ValueError("Tile doesn't match the left end.")
-        elif side == 'right':
-            if tile[0] == right_end: board.append(tile)
-            elif tile[1] == right_end: board.append((tile[1], tile[0]))
-            else: raise ValueError("Tile doesn't match the right end.")
+        if at_left:
+            board.insert(0, placed_tile)
+        else:
+            board.append(placed_tile)
+        game_state['left_end'], game_state['right_end'] = new_left, new_right
 
-        game_state['log'].append(f"{player_id} played {tile}.")
+        if log: log(f"{player_id} played {tile}.")
 
         if not hand:
             # Hand finished - calculate points
-            game_mode = game_state.get('game_mode', 'classic')
             winner_id = player_id
             points_awarded = 0
             won_with_chucha = (tile == (0, 0))
             
             # Bonus checks
-            new_left, new_right = get_open_ends(board)
+            new_left, new_right = game_state['left_end'], game_state['right_end']
             is_capicu = (tile[0] == new_right or tile[1] == new_right) and \
                        (tile[0] == new_left or tile[1] == new_left)
             if is_capicu:
                 game_state['last_move_was_capicu'] = True
-                game_state['log'].append("🎉 ¡CAPICÚ!")
+                if log: log("🎉 ¡CAPICÚ!")
             
-            if game_mode == "classic":
+            if mode == MODE_CLASSIC:
                 # Classic: Best of 5, no prizes
                 game_state['hand_wins'][winner_id] += 1
-                game_state['log'].append(f"🏆 {winner_id} WINS HAND #{game_state['hand_number']}!")
+                if log: log(f"🏆 {winner_id} WINS HAND #{game_state['hand_number']}!")
                 
                 # Check if someone won best of 5
                 if game_state['hand_wins'][winner_id] >= 3:
                     game_state['status'] = "finished"
                     game_state['winner'] = winner_id
-                    game_state['log'].append(f"🎊🎊🎊 {winner_id} WINS THE GAME (Best of 5)! 🎊🎊🎊")
+                    if log: log(f"🎊🎊🎊 {winner_id} WINS THE GAME (Best of 5)! 🎊🎊🎊")
                 else:
                     # Start new hand - wait for all players to be ready
                     game_state['status'] = "hand_finished"
                     game_state['winner'] = winner_id
                     game_state['ready_for_next_hand'] = {}  # Track who's ready: {player_id: True}
-                    game_state['log'].append(f"🏆 Hand {game_state['hand_number']} complete! All players must click 'Next Hand' to continue.")
+                    if log: log(f"🏆 Hand {game_state['hand_number']} complete! All players must click 'Next Hand' to continue.")
                     
-            elif game_mode == "boricua":
+            elif mode == MODE_BORICUA:
                 # Boricua: First to 500, with prizes
                 hand_num = game_state['hand_number']
                 
                 # Determine points based on hand number
-                if hand_num == 1:
-                    points_awarded = 100
-                elif hand_num == 2:
-                    points_awarded = 75
-                elif hand_num == 3:
-                    points_awarded = 50
-                elif hand_num == 4:
-                    points_awarded = 25
-                else:
-                    points_awarded = 25  # Default for additional hands
+                points_awarded = _HAND_POINTS[hand_num] if 1 <= hand_num <= 4 else 25
                 
                 # Bonus for winning with 0/0 (LA CHUCHA)
                 if won_with_chucha:
                     points_awarded += 100
-                    game_state['log'].append("💥 ¡LA CHUCHA! +100 BONUS POINTS!")
+                    if log: log("💥 ¡LA CHUCHA! +100 BONUS POINTS!")
                 
                 # Award points to team
                 teams = game_state.get('teams')
                 team_scores = game_state.get('team_scores')
                 if teams and team_scores:
                     # Find which team the winner is on
-                    winning_team = None
-                    for team_name, team_players in teams.items():
-                        if winner_id in team_players:
-                            winning_team = team_name
-                            break
+                    winning_team = game_state['player_to_team'].get(winner_id)
                     
                     if winning_team:
                         team_scores[winning_team] += points_awarded
-                        game_state['log'].append(f"🏆 {winning_team.upper()} WINS HAND #{hand_num} - {points_awarded} POINTS!")
-                        game_state['log'].append(f"📊 SCORES: {teams['team1']} = {team_scores['team1']} | {teams['team2']} = {team_scores['team2']}")
-                        
-                        # Check if a team reached 500
-                        if team_scores[winning_team] >= 500:
-                            game_state['status'] = "finished"
-                            game_state['winner'] = winning_team
-                            game_state['log'].append(f"🎊🎊🎊 {winning_team.upper()} WINS THE GAME! 🎊🎊🎊")
-                        else:
-                            # Start new hand - wait for all players to be ready
-                            game_state['status'] = "hand_finished"
-                            game_state['winner'] = winning_team
-                            game_state['hand_number'] += 1
-                            game_state['ready_for_next_hand'] = {}  # Track who's ready: {player_id: True}
-                            game_state['log'].append(f"🏆 Hand {hand_num} complete! All players must click 'Next Hand' to continue.")
+                        if log: log(f"🏆 {winning_team.upper()} WINS HAND #{hand_num} - {points_awarded} POINTS!")
+                        if log: log(f"📊 SCORES: {teams['team1']} = {team_scores['team1']} | {teams['team2']} = {team_scores['team2']}")
+                        _finalize_hand(game_state, winning_team, log)
             
-            if won_with_chucha and game_mode != "boricua":
-                game_state['log'].append("💥 ¡CHUCHAZO! (Won with 0-0)")
+            if won_with_chucha and mode != MODE_BORICUA:
+                if log: log("💥 ¡CHUCHAZO! (Won with 0-0)")
 
     else:
         raise ValueError("Invalid action.")
@@ -369,7 +424,7 @@ def play_move(game_state: dict, player_id: str, move_data: dict):
     # Advance Turn
     if game_state['status'] == 'in_progress':
         # Only advance turn if player didn't just draw
-        if action != "draw":
-             game_state['current_turn_index'] = (turn_index + 1) % len(game_state['players'])
+        if action != ACTION_DRAW:
+             game_state['current_turn_index'] = (turn_index + 1) % len(players)
     
     return game_state
\ No newline at end of file
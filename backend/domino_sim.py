@@ -0,0 +1,69 @@
+# backend/domino_sim.py
+"""
+Headless dominoes self-play for AI/solver work. No server, database, or
+logging: each game is a pure function of its seed, so games spread across
+CPU cores with a process pool.
+"""
+import random
+import sys
+from collections import Counter
+from functools import partial
+from multiprocessing import Pool, cpu_count
+
+import domino_logic
+
+def first_playable_policy(game_state: dict, player_id: str) -> dict:
+    """Mirrors the server AI: play the first tile that fits, else draw, else pass."""
+    hand = game_state['hands'][player_id]
+    left_end, right_end = game_state['left_end'], game_state['right_end']
+    
+    if left_end is None:
+        if hand:
+            return {"action": "play", "tile": list(max(hand, key=lambda t: t[0] + t[1])), "side": "right"}
+    else:
+        for a, b in hand:
+            if a == left_end or b == left_end:
+                return {"action": "play", "tile": [a, b], "side": "left"}
+            if a == right_end or b == right_end:
+                return {"action": "play", "tile": [a, b], "side": "right"}
+        if game_state['boneyard']:
+            return {"action": "draw"}
+    return {"action": "pass"}
+
+def run_game(seed: int, policy_fn=first_playable_policy, player_ids=("p1", "p2", "p3", "p4"),
+             game_mode: str = "classic", max_moves: int = 500) -> dict:
+    """Plays one hand to completion with a private RNG seeded from seed."""
+    rng = random.Random(seed)
+    game_state = domino_logic.create_new_game(list(player_ids), game_mode, log_enabled=False, rng=rng)
+    
+    moves = 0
+    while game_state['status'] == 'in_progress' and moves < max_moves:
+        player_id = game_state['players'][game_state['current_turn_index']]
+        game_state = domino_logic.play_move(game_state, player_id, policy_fn(game_state, player_id))
+        moves += 1
+    
+    return {
+        "seed": seed,
+        "status": game_state['status'],
+        "winner": game_state['winner'],
+        "moves": moves,
+        "starting_player_id": game_state['starting_player_id'],
+        "pips_left": dict(game_state['hand_pip_sum']),
+    }
+
+def simulate_many(seeds, policy_fn=first_playable_policy, workers: int = None, chunksize: int = 64, **game_kwargs):
+    """
+    Runs run_game for every seed on a process pool and returns the results
+    (in completion order). policy_fn must be a module-level function so it
+    can be pickled to the workers.
+    """
+    run = partial(run_game, policy_fn=policy_fn, **game_kwargs)
+    with Pool(workers or cpu_count()) as pool:
+        return list(pool.imap_unordered(run, seeds, chunksize=chunksize))
+
+if __name__ == "__main__":
+    # python domino_sim.py [games] [classic|boricua]
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    game_mode = sys.argv[2] if len(sys.argv) > 2 else "classic"
+    results = simulate_many(range(games), game_mode=game_mode)
+    print(Counter(result['winner'] for result in results).most_common())
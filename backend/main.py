@@ -1,10 +1,16 @@
 # backend/main.py
 import uvicorn
 import motor.motor_asyncio
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 import random
+import secrets
 import string
-import json
 import asyncio
+from contextlib import asynccontextmanager
+import orjson
+import bson
+from bson.raw_bson import RawBSONDocument
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from pydantic import BaseModel, Field
 from fastapi.staticfiles import StaticFiles
@@ -21,7 +27,13 @@ GAME_LOGIC_MODULES = {
 }
 
 # --- App Setup ---
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Don't drop game writes that are still queued when the server stops
+    await game_store.flush_all()
+
+app = FastAPI(lifespan=lifespan)
 MONGO_DETAILS = "mongodb://localhost:27017/?retryWrites=true&w=majority&directConnection=true" # Assumes MongoDB is running
 client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_DETAILS)
 db = client.game_portal_db
@@ -32,40 +44,314 @@ class ConnectionManager:
     def __init__(self):
         # { "game_id": { "player_id": WebSocket } }
         self.active_connections: dict[str, dict[str, WebSocket]] = {}
+        # { "game_id": (log list, length) } - the log as of the last state broadcast
+        self.sent_logs: dict[str, tuple[list, int]] = {}
+        # { "game_id": (players list, length, AI-flagged copy) } - valid until someone connects/leaves
+        self.player_lists: dict[str, tuple[list, int, list[dict]]] = {}
 
     async def connect(self, websocket: WebSocket, game_id: str, player_id: str):
         await websocket.accept()
         if game_id not in self.active_connections:
             self.active_connections[game_id] = {}
         self.active_connections[game_id][player_id] = websocket
+        self.player_lists.pop(game_id, None)
 
     def disconnect(self, game_id: str, player_id: str):
-        if game_id in self.active_connections and player_id in self.active_connections[game_id]:
-            del self.active_connections[game_id][player_id]
+        connections = self.active_connections.get(game_id)
+        if connections is None:
+            return
+        connections.pop(player_id, None)
+        self.player_lists.pop(game_id, None)
+        # Drop empty games so the map doesn't grow with every finished game
+        if not connections:
+            del self.active_connections[game_id]
+            self.sent_logs.pop(game_id, None)
 
     async def broadcast_to_game(self, game_id: str, message: dict):
-        if game_id in self.active_connections:
-            for player_id, connection in self.active_connections[game_id].items():
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    print(f"Error sending to {player_id}: {e}")
-
-    async def send_to_player(self, game_id: str, player_id: str, message: dict):
+        connections = self.active_connections.get(game_id)
+        if not connections:
+            return
+        frame = orjson.dumps(message).decode()
+        await self._send_all([(player_id, connection, frame) for player_id, connection in connections.items()])
+
+    async def send_to_player(self, game_id: str, player_id: str, message: dict | str):
+        """Sends a message dict, or a frame already encoded with encode_message()."""
         if game_id in self.active_connections and player_id in self.active_connections[game_id]:
+            frame = message if isinstance(message, str) else orjson.dumps(message).decode()
             try:
-                await self.active_connections[game_id][player_id].send_json(message)
+                await self.active_connections[game_id][player_id].send_text(frame)
             except Exception as e:
                 print(f"Error sending to {player_id}: {e}")
+
+    async def broadcast_encoded(self, game_id: str, view_by_player: dict[str, str]):
+        """Sends pre-encoded JSON text frames, one per player, without re-serializing."""
+        connections = self.active_connections.get(game_id)
+        if not connections:
+            return
+        await self._send_all([
+            (player_id, connections[player_id], frame)
+            for player_id, frame in view_by_player.items()
+            if player_id in connections
+        ])
+
+    async def _send_all(self, sends: list[tuple[str, WebSocket, str]]):
+        """Writes to all sockets concurrently so one slow client doesn't hold up the rest."""
+        results = await asyncio.gather(
+            *(connection.send_text(frame) for _, connection, frame in sends),
+            return_exceptions=True
+        )
+        for (player_id, _, _), result in zip(sends, results):
+            if isinstance(result, Exception):
+                print(f"Error sending to {player_id}: {result}")
                 
 manager = ConnectionManager()
 
+# --- Game Store ---
+# Everything but game_state, for code paths that never look at the board/hands
+LOBBY_FIELDS = {"game_type": 1, "host_id": 1, "players": 1, "status": 1, "game_mode": 1}
+
+class GameStore:
+    """
+    Authoritative in-memory copy of active game documents.
+    This process is the only writer for the games it serves, so a document
+    is read from MongoDB once and every later write updates the cached copy
+    immediately and is persisted to MongoDB in the background.
+    """
+    def __init__(self, collection):
+        self.collection = collection
+        # { "game_id": game_document }
+        self.games: dict[str, dict] = {}
+        # { "game_id": asyncio.Lock } - serializes actions on the same game
+        self.locks: dict[str, asyncio.Lock] = {}
+        # { "game_id": int } - coroutines holding or waiting on that lock
+        self.lock_users: dict[str, int] = {}
+        # { "game_id": asyncio.Task } - the most recently scheduled write
+        self.pending_writes: dict[str, asyncio.Task] = {}
+        # { "game_id": [{"update": ...}] } - queued writes that haven't been sent yet
+        self.unsent: dict[str, list[dict]] = {}
+        # Pending idle-lobby evictions; the loop only holds tasks weakly, so keep them here
+        self.idle_evictions: set[asyncio.Task] = set()
+
+    @asynccontextmanager
+    async def lock(self, game_id: str):
+        """
+        Holds game_id's lock. The lock is forgotten once nobody holds or waits
+        on it and the game isn't cached, so requests for unknown or idle
+        games don't leave locks behind.
+        """
+        lock = self.locks.get(game_id)
+        if lock is None:
+            lock = self.locks[game_id] = asyncio.Lock()
+        self.lock_users[game_id] = self.lock_users.get(game_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self.lock_users[game_id] -= 1
+            if not self.lock_users[game_id]:
+                del self.lock_users[game_id]
+                if game_id not in self.games:
+                    del self.locks[game_id]
+
+    async def get(self, game_id: str):
+        game = self.games.get(game_id)
+        if game is None:
+            game = await self.collection.find_one({"_id": game_id})
+            if game is not None:
+                if game['game_type'] == 'dominoes' and game.get('game_state'):
+                    # Games saved before the engine kept running fields
+                    domino_logic.fill_missing_fields(game['game_state'])
+                # Another coroutine may have loaded it while we awaited
+                game = self.games.setdefault(game_id, game)
+        return game
+
+    async def get_lobby_fields(self, game_id: str):
+        """
+        Returns the game without loading its game_state when it isn't cached.
+        Used by lobby code that only needs players/status; the result is not cached.
+        """
+        game = self.games.get(game_id)
+        if game is None:
+            game = await self.collection.find_one({"_id": game_id}, projection=LOBBY_FIELDS)
+        return game
+
+    async def insert(self, game_document: dict):
+        await self.collection.insert_one(game_document)
+        self.games[game_document["_id"]] = game_document
+
+    def set_fields(self, game_id: str, fields: dict) -> asyncio.Task:
+        game_state = fields.get('game_state')
+        if game_state:
+            trim_log(game_state)
+        game = self.games.get(game_id)
+        if game is not None:
+            game.update(fields)
+        # Snapshot now: the live dicts keep changing while the write is queued
+        snapshot = {key: _bson_snapshot(value) for key, value in fields.items()}
+        return self._schedule_write(game_id, {"$set": snapshot})
+
+    def apply_update(self, game_id: str, update: dict) -> asyncio.Task:
+        """Persists a targeted update whose effect is already applied to the cached document."""
+        return self._schedule_write(game_id, update)
+
+    def push_players(self, game_id: str, players: list[dict]) -> asyncio.Task:
+        game = self.games.get(game_id)
+        if game is not None:
+            game['players'].extend(players)
+        snapshot = [_bson_snapshot(p) for p in players]
+        return self._schedule_write(game_id, {"$push": {"players": {"$each": snapshot}}})
+
+    async def add_player(self, game_id: str, player: dict, max_players: int):
+        """
+        Adds a player to a waiting game that has room and doesn't have them yet.
+        Returns the updated game (lobby fields only if it wasn't cached), or
+        None if any of those conditions failed.
+        """
+        game = self.games.get(game_id)
+        if game is not None:
+            players = game['players']
+            if (game['status'] != 'waiting' or len(players) >= max_players
+                    or any(p['player_id'] == player['player_id'] for p in players)):
+                return None
+            self.push_players(game_id, [player])
+            return game
+
+        # Not cached: check and push in one round trip. Awaited, so the
+        # player's WebSocket connect that follows is guaranteed to see them.
+        return await self.collection.find_one_and_update(
+            {
+                "_id": game_id,
+                "status": "waiting",
+                f"players.{max_players - 1}": {"$exists": False},
+                "players.player_id": {"$ne": player['player_id']},
+            },
+            {"$push": {"players": player}},
+            projection=LOBBY_FIELDS,
+            return_document=ReturnDocument.AFTER
+        )
+
+    def _schedule_write(self, game_id: str, update: dict) -> asyncio.Task:
+        """
+        Queues an update behind any earlier write for the same game, so they land in order.
+        Queued writes that a new $set fully overwrites are dropped, so a burst of
+        saves while MongoDB is slow costs one round trip instead of one each.
+        """
+        unsent = self.unsent.setdefault(game_id, [])
+        if update.keys() == {"$set"}:
+            for entry in unsent:
+                if entry["update"] is not None and _overwrites(update["$set"], entry["update"]):
+                    entry["update"] = None
+        entry = {"update": update}
+        unsent.append(entry)
+        task = asyncio.create_task(self._write(self.pending_writes.get(game_id), game_id, entry))
+        self.pending_writes[game_id] = task
+        task.add_done_callback(lambda t: self._write_done(game_id, t))
+        return task
+
+    async def _write(self, previous, game_id: str, entry: dict):
+        if previous is not None:
+            await asyncio.wait([previous])
+        self.unsent[game_id].remove(entry)
+        update = entry["update"]
+        if update is None:
+            return
+        try:
+            await self.collection.update_one({"_id": game_id}, update)
+        except Exception as e:
+            print(f"Error saving game {game_id}: {e}")
+
+    def _write_done(self, game_id: str, task: asyncio.Task):
+        if self.pending_writes.get(game_id) is task:
+            del self.pending_writes[game_id]
+            self.unsent.pop(game_id, None)
+
+    async def flush(self, game_id: str):
+        """Waits until every write scheduled so far for game_id has reached MongoDB."""
+        task = self.pending_writes.get(game_id)
+        if task is not None:
+            await asyncio.wait([task])
+
+    async def flush_all(self):
+        if self.pending_writes:
+            await asyncio.wait(list(self.pending_writes.values()))
+
+    async def evict(self, game_id: str):
+        """Drops a game nobody is connected to; it is reloaded from MongoDB on next use."""
+        await self.flush(game_id)
+        self.games.pop(game_id, None)
+        if game_id not in self.lock_users:
+            self.locks.pop(game_id, None)
+
+def _overwrites(set_fields: dict, update: dict) -> bool:
+    """True if $set-ing set_fields replaces every field that update touches."""
+    return all(
+        any(path == key or path.startswith(key + ".") for key in set_fields)
+        for fields in update.values()
+        for path in fields
+    )
+
+def save_ready_marks(game_id: str, game_state: dict, ready_field: str, player_ids: list[str], log_start: int):
+    """
+    Persists a ready-up without rewriting the whole game_state: sets
+    game_state.<ready_field>.<pid> for the newly ready players and pushes
+    the log lines added since log_start. Falls back to a full save when a
+    player ID can't be used as a dotted field name.
+    """
+    if any('.' in pid or pid.startswith('$') for pid in player_ids):
+        return game_store.set_fields(game_id, {"game_state": game_state})
+    return game_store.apply_update(game_id, {
+        "$set": {f"game_state.{ready_field}.{pid}": True for pid in player_ids},
+        "$push": {"game_state.log": {"$each": game_state['log'][log_start:]}}
+    })
+
+# The log is cut back to its newest half once it passes this many entries.
+# Cutting by half (not one entry at a time) keeps the log list stable between
+# cuts, so broadcasts can keep sending just its new tail.
+LOG_MAX_ENTRIES = 50
+
+def trim_log(game_state: dict):
+    """Keeps game_state['log'] bounded so saves and broadcasts don't grow with the game."""
+    log = game_state.get('log')
+    if log is not None and len(log) > LOG_MAX_ENTRIES:
+        # A new list, so the next broadcast knows to send the log in full
+        game_state['log'] = log[-(LOG_MAX_ENTRIES // 2):]
+
+def _bson_snapshot(value):
+    """Encodes a dict to BSON up front so a queued write can't see later in-place mutations."""
+    if isinstance(value, dict):
+        return RawBSONDocument(bson.encode(value))
+    return value
+
+game_store = GameStore(games_collection)
+
+# A lobby nobody opens a socket to is dropped from memory after this long
+LOBBY_IDLE_SECONDS = 300
+
+async def evict_if_idle(game_id: str):
+    """Evicts a game from the store if no player is connected to it."""
+    async with game_store.lock(game_id):
+        if not manager.active_connections.get(game_id):
+            await game_store.evict(game_id)
+
+async def _evict_after_idle(game_id: str):
+    await asyncio.sleep(LOBBY_IDLE_SECONDS)
+    await evict_if_idle(game_id)
+
+def schedule_idle_eviction(game_id: str):
+    task = asyncio.create_task(_evict_after_idle(game_id))
+    game_store.idle_evictions.add(task)
+    task.add_done_callback(game_store.idle_evictions.discard)
+
 # --- Utility Functions ---
+GAME_ID_ALPHABET = string.ascii_uppercase + string.digits
+PLAYER_ID_ALPHABET = string.ascii_lowercase + string.digits
+
 def generate_game_id(length=6):
-    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
+    # Uppercase only, so it survives the client's toUpperCase() on typed IDs
+    return ''.join(secrets.choice(GAME_ID_ALPHABET) for _ in range(length))
 
 def generate_player_id(length=10):
-    return "p_" + ''.join(random.choices(string.ascii_lowercase + string.digits, k=length))
+    return "p_" + ''.join(secrets.choice(PLAYER_ID_ALPHABET) for _ in range(length))
 
 def generate_ai_player_name():
     """Generates a random AI player name."""
@@ -97,20 +383,32 @@ def is_ai_player(game_id: str, player_id: str) -> bool:
         return True
     return player_id not in manager.active_connections[game_id]
 
-def make_ai_move_blackjack(game_state: dict, player_id: str) -> dict:
-    """Simple AI for blackjack: hit if value < 17, otherwise stand."""
+def get_players_with_ai_status(game_id: str, players: list[dict]) -> list[dict]:
+    """
+    Returns the client player list, flagging every player without a socket as AI.
+    The list is reused until a player connects or disconnects, or the players
+    list itself changes (joins only ever append to it).
+    """
+    cached_players, cached_length, flagged = manager.player_lists.get(game_id, (None, 0, None))
+    if cached_players is players and cached_length == len(players):
+        return flagged
+    connected = manager.active_connections.get(game_id, {})
+    flagged = [{**p, 'isAI': p['player_id'] not in connected} for p in players]
+    if connected:
+        manager.player_lists[game_id] = (players, len(players), flagged)
+    return flagged
+
+def choose_ai_move_blackjack(game_state: dict, player_id: str):
+    """Simple AI for blackjack: hit if value < 17, otherwise stand. None if the player is done."""
     player_state = game_state['hands'][player_id]
     if player_state['status'] != 'playing':
-        return game_state
+        return None
     
     if player_state['value'] < 17:
-        move_data = {"action": "hit"}
-    else:
-        move_data = {"action": "stand"}
-    
-    return blackjack_logic.play_move(game_state, player_id, move_data)
+        return {"action": "hit"}
+    return {"action": "stand"}
 
-def make_ai_move_dominoes(game_state: dict, player_id: str) -> dict:
+def choose_ai_move_dominoes(game_state: dict, player_id: str) -> dict:
     """Simple AI for dominoes: play first valid tile, or draw if none, or pass."""
     hand = game_state['hands'][player_id]
     board = game_state['board']
@@ -118,71 +416,161 @@ def make_ai_move_dominoes(game_state: dict, player_id: str) -> dict:
     if not board:
         # First move: play highest tile
         if hand:
-            highest_tile = max(hand, key=lambda t: sum(t))
-            move_data = {"action": "play", "tile": list(highest_tile), "side": "right"}
-            return domino_logic.play_move(game_state, player_id, move_data)
+            highest_tile = max(hand, key=lambda t: t[0] + t[1])
+            return {"action": "play", "tile": list(highest_tile), "side": "right"}
     else:
-        # Find a playable tile
-        left_end, right_end = domino_logic.get_open_ends(board)
-        for tile in hand:
-            if tile[0] == left_end or tile[1] == left_end:
-                move_data = {"action": "play", "tile": list(tile), "side": "left"}
-                return domino_logic.play_move(game_state, player_id, move_data)
-            elif tile[0] == right_end or tile[1] == right_end:
-                move_data = {"action": "play", "tile": list(tile), "side": "right"}
-                return domino_logic.play_move(game_state, player_id, move_data)
+        # Find a playable tile. The state already tracks its open ends, so
+        # nothing is recomputed from the board on each AI turn.
+        left_end, right_end = game_state['left_end'], game_state['right_end']
+        for a, b in hand:
+            if a == left_end or b == left_end:
+                return {"action": "play", "tile": [a, b], "side": "left"}
+            elif a == right_end or b == right_end:
+                return {"action": "play", "tile": [a, b], "side": "right"}
         
         # No playable tile: draw if possible, otherwise pass
         if game_state['boneyard']:
-            move_data = {"action": "draw"}
-            return domino_logic.play_move(game_state, player_id, move_data)
-        else:
-            move_data = {"action": "pass"}
-            return domino_logic.play_move(game_state, player_id, move_data)
+            return {"action": "draw"}
     
-    # Fallback: pass
-    move_data = {"action": "pass"}
-    return domino_logic.play_move(game_state, player_id, move_data)
+    return {"action": "pass"}
 
-def sanitize_game_state_for_player(game_type: str, game_state: dict, player_id: str):
+AI_MOVE_CHOOSERS = {
+    "blackjack": choose_ai_move_blackjack,
+    "dominoes": choose_ai_move_dominoes,
+}
+
+def _sanitize_common(game_type: str, game_state: dict):
     """
-    Hides sensitive info (other hands, boneyard, dealer card) before sending.
+    Sanitization that is the same for every viewer: boneyard/deck summaries
+    and the dealer's hole card. Returns a shallow copy of the state.
     """
     if not game_state:
         return None
 
-    # Use json library to create a deep copy to avoid modifying the original
-    sanitized_state = json.loads(json.dumps(game_state))
-    
-    # --- Generic Sanitization ---
-    if 'hands' in sanitized_state:
-        for pid, hand_data in sanitized_state['hands'].items():
-            if pid != player_id:
-                if game_type == 'dominoes':
-                    sanitized_state['hands'][pid] = f"{len(hand_data)} tiles"
-                elif game_type == 'blackjack':
-                    # Hide hand, but keep status
-                    sanitized_state['hands'][pid]['hand'] = f"{len(hand_data['hand'])} cards"
-
-    if 'boneyard' in sanitized_state: # Dominoes
+    sanitized_state = dict(game_state)
+
+    if 'boneyard' in game_state: # Dominoes
         # Preserve count for current player (they need to know if they can draw)
-        if isinstance(sanitized_state['boneyard'], list):
-            sanitized_state['boneyard_count'] = len(sanitized_state['boneyard'])
-        sanitized_state['boneyard'] = f"{len(sanitized_state['boneyard']) if isinstance(sanitized_state['boneyard'], list) else 0} tiles"
-    if 'deck' in sanitized_state: # Blackjack
-        sanitized_state['deck'] = f"{len(sanitized_state['deck'])} cards"
+        boneyard = game_state['boneyard']
+        if isinstance(boneyard, list):
+            sanitized_state['boneyard_count'] = len(boneyard)
+        sanitized_state['boneyard'] = f"{len(boneyard) if isinstance(boneyard, list) else 0} tiles"
+        # Per-player pip totals would reveal opponents' hands (and every drawn tile)
+        sanitized_state.pop('hand_pip_sum', None)
+    if 'deck' in game_state: # Blackjack
+        sanitized_state['deck'] = f"{len(game_state['deck'])} cards"
 
     # --- Game-Specific Sanitization ---
-    if game_type == 'blackjack' and sanitized_state['status'] == 'in_progress':
+    if game_type == 'blackjack' and game_state['status'] == 'in_progress':
         # Hide dealer's hole card
-        first_card = sanitized_state['dealer_hand'][0]
+        first_card = game_state['dealer_hand'][0]
         sanitized_state['dealer_hand'] = [first_card, {"rank": "?", "suit": ""}]
         # Show only the value of the up-card
         sanitized_state['dealer_value'] = first_card['value']
         if first_card['rank'] == 'A': sanitized_state['dealer_value'] = 11
-    
+
     return sanitized_state
 
+def _masked_hands(common: dict, game_type: str):
+    """Returns every hand as another player sees it; built once per broadcast and shared by all viewers."""
+    masked_hands = {}
+    for pid, hand_data in common['hands'].items():
+        if game_type == 'dominoes':
+            masked_hands[pid] = f"{len(hand_data)} tiles"
+        elif game_type == 'blackjack':
+            # Hide hand, but keep status
+            masked_hands[pid] = {**hand_data, 'hand': f"{len(hand_data['hand'])} cards"}
+        else:
+            masked_hands[pid] = hand_data
+    return masked_hands
+
+def _mask_hands_for(common: dict, game_type: str, player_id: str, masked_hands: dict = None):
+    """Returns a copy of an already common-sanitized state with other players' hands hidden."""
+    if not common:
+        return None
+
+    if 'hands' not in common:
+        return common
+
+    if masked_hands is None:
+        masked_hands = _masked_hands(common, game_type)
+    return {**common, 'hands': _hands_for(common['hands'], masked_hands, player_id)}
+
+def _hands_for(hands: dict, masked_hands: dict, player_id: str):
+    """The hands as player_id sees them: everyone else's masked, their own in full."""
+    viewer_hands = dict(masked_hands)
+    if player_id in viewer_hands:
+        viewer_hands[player_id] = hands[player_id]
+    return viewer_hands
+
+def sanitize_game_state_for_player(game_type: str, game_state: dict, player_id: str):
+    """
+    Hides sensitive info (other hands, boneyard, dealer card) before sending.
+    Returns a shallow copy: only the masked keys are replaced, so the
+    original state is never modified and nothing is deep-copied.
+    Broadcasts should go through broadcast_game_state(), which runs
+    _sanitize_common() once and only encodes the hands per recipient.
+    """
+    return _mask_hands_for(_sanitize_common(game_type, game_state), game_type, player_id)
+
+def encode_message(message: dict) -> str:
+    """Serializes a WebSocket message once so the same frame can be sent as text."""
+    return orjson.dumps(message).decode()
+
+async def broadcast_game_state(game_id: str, game_type: str, game_state: dict, message_type: str = "state_update", players: list = None, **extra):
+    """
+    Sends every connected player their own sanitized view of game_state.
+    Everything but the hands is the same for every viewer, so it is
+    sanitized and encoded once; each view only encodes that player's
+    hands and splices them into the shared JSON.
+    AI players have no socket, so no view is built for them.
+    Any extra keyword arguments are added to every message as-is.
+    A state_update whose log extends the one last broadcast carries only
+    log_start/log_tail instead of the full log.
+    """
+    connections = manager.active_connections.get(game_id)
+    if not connections:
+        return
+
+    common_state = _sanitize_common(game_type, game_state)
+
+    # The log only ever grows within a hand/round, so when clients already
+    # have the start of this same list, send just the new tail
+    log = game_state.get('log')
+    log_delta = {}
+    if log is not None:
+        sent_log, sent_length = manager.sent_logs.get(game_id, (None, 0))
+        if message_type == "state_update" and sent_log is log and sent_length <= len(log):
+            del common_state['log']
+            log_delta = {"log_start": sent_length, "log_tail": log[sent_length:]}
+        manager.sent_logs[game_id] = (log, len(log))
+
+    message = {"type": message_type}
+    if players is not None:
+        message["players"] = players
+    message.update(log_delta)
+    message.update(extra)
+
+    # common_state is our own shallow copy, so the hands can come out of it.
+    # The frame is {...message, "game_state": {...common_state, "hands": ...}}
+    hands = common_state.pop('hands', None)
+    message_head = orjson.dumps(message)[:-1] + b',"game_state":'
+    state_json = orjson.dumps(common_state)
+    viewers = [pid for pid in game_state['players'] if pid in connections]
+
+    if hands is None:
+        frame = (message_head + state_json + b'}').decode()
+        view_by_player = {pid: frame for pid in viewers}
+    else:
+        state_head = state_json[:-1] + (b',"hands":' if common_state else b'"hands":')
+        masked_hands = _masked_hands({'hands': hands}, game_type)
+        view_by_player = {
+            pid: (message_head + state_head + orjson.dumps(_hands_for(hands, masked_hands, pid)) + b'}}').decode()
+            for pid in viewers
+        }
+
+    await manager.broadcast_encoded(game_id, view_by_player)
+
 # --- HTTP API Models ---
 class CreateGameRequest(BaseModel):
     player_id: str = Field(..., min_length=1, max_length=200)
@@ -199,48 +587,53 @@ async def create_game(request: CreateGameRequest):
     if request.game_type not in GAME_LOGIC_MODULES:
         raise HTTPException(status_code=400, detail="Invalid game type.")
         
-    game_id = generate_game_id()
     player_id = request.player_id  # Use fingerprint as player_id
     
-    game_document = {
-        "_id": game_id,
-        "game_type": request.game_type,
-        "game_mode": request.game_mode if request.game_type == "dominoes" else None,
-        "host_id": player_id,
-        "players": [
-            {"player_id": player_id}
-        ],
-        "status": "waiting",
-        "game_state": None
-    }
-    await games_collection.insert_one(game_document)
+    # Games are never deleted, so an ID can already be taken; draw again
+    for _ in range(5):
+        game_id = generate_game_id()
+        game_document = {
+            "_id": game_id,
+            "game_type": request.game_type,
+            "game_mode": request.game_mode if request.game_type == "dominoes" else None,
+            "host_id": player_id,
+            "players": [
+                {"player_id": player_id}
+            ],
+            "status": "waiting",
+            "game_state": None
+        }
+        try:
+            await game_store.insert(game_document)
+            break
+        except DuplicateKeyError:
+            continue
+    else:
+        raise HTTPException(status_code=503, detail="Could not allocate a game ID, try again.")
+
+    # Cached until someone connects; don't keep it if nobody ever does
+    schedule_idle_eviction(game_id)
     
     return {"game_id": game_id, "player_id": player_id}
 
 @app.post("/api/game/{game_id}/join")
 async def join_game(game_id: str, request: JoinGameRequest):
     """Allows a new player to join a waiting game."""
-    game = await games_collection.find_one({"_id": game_id})
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found.")
-    if game['status'] != 'waiting':
-        raise HTTPException(status_code=400, detail="Game has already started.")
-    if len(game['players']) >= 4:
-        raise HTTPException(status_code=400, detail="Game is full.")
-
     player_id = request.player_id  # Use fingerprint as player_id
     
-    # Check if player already in game
-    existing_player = next((p for p in game.get('players', []) if p.get('player_id') == player_id), None)
-    if existing_player:
-        return {"game_id": game_id, "player_id": player_id}
-    
-    new_player = {"player_id": player_id}
-    
-    await games_collection.update_one(
-        {"_id": game_id},
-        {"$push": {"players": new_player}}
-    )
+    async with game_store.lock(game_id):
+        game = await game_store.add_player(game_id, {"player_id": player_id}, max_players=4)
+        if not game:
+            # The join didn't apply; work out why
+            game = await game_store.get_lobby_fields(game_id)
+            if not game:
+                raise HTTPException(status_code=404, detail="Game not found.")
+            if game['status'] != 'waiting':
+                raise HTTPException(status_code=400, detail="Game has already started.")
+            if len(game['players']) >= 4:
+                raise HTTPException(status_code=400, detail="Game is full.")
+            # Player already in game
+            return {"game_id": game_id, "player_id": player_id}
     
     # Notify lobby (via WebSocket) that someone joined
     await manager.broadcast_to_game(game_id, {
@@ -250,10 +643,22 @@ async def join_game(game_id: str, request: JoinGameRequest):
     
     return {"game_id": game_id, "player_id": player_id}
 
-async def process_ai_moves(game_id: str, game_type: str, game_state: dict):
-    """Processes AI moves until it's a human player's turn or the game ends."""
+# Delay between AI moves when the client replays a chain
+AI_MOVE_PACING_MS = 500
+
+async def process_ai_moves(game_id: str, game_type: str, game_state: dict, players: list = None, message_type: str = None):
+    """
+    Processes AI moves until it's a human player's turn or the game ends.
+    The whole chain runs in memory; the final state is saved and broadcast
+    once, together with the list of AI moves that led to it so the client
+    can pace them out.
+    Callers that just changed (and saved) game_state pass message_type
+    instead of broadcasting it themselves: the state then goes out once,
+    as that message type, whether or not any AI moved.
+    """
     max_iterations = 20  # Safety limit to prevent infinite loops
     iteration = 0
+    ai_moves = []
     
     while game_state['status'] == 'in_progress' and iteration < max_iterations:
         iteration += 1
@@ -270,47 +675,51 @@ async def process_ai_moves(game_id: str, game_type: str, game_state: dict):
             break  # It's a human player's turn, stop processing
         
         # Make AI move
+        choose_move = AI_MOVE_CHOOSERS.get(game_type)
+        if choose_move is None:
+            break
         try:
-            if game_type == 'blackjack':
-                game_state = make_ai_move_blackjack(game_state, current_player_id)
-            elif game_type == 'dominoes':
-                game_state = make_ai_move_dominoes(game_state, current_player_id)
-            else:
+            move_data = choose_move(game_state, current_player_id)
+            if move_data is None:
                 break
-            
-            # Update game state in database
-            await games_collection.update_one(
-                {"_id": game_id},
-                {"$set": {"game_state": game_state}}
-            )
-            
-            # Broadcast updated state to all players
-            for pid in game_state['players']:
-                sanitized = sanitize_game_state_for_player(game_type, game_state, pid)
-                await manager.send_to_player(game_id, pid, {
-                    "type": "state_update",
-                    "game_state": sanitized
-                })
-            
-            # Small delay to make AI moves visible
-            await asyncio.sleep(0.5)
+            log_start = len(game_state['log'])
+            game_state = GAME_LOGIC_MODULES[game_type].play_move(game_state, current_player_id, move_data)
+            ai_moves.append({
+                "player_id": current_player_id,
+                # What the client needs to replay the board one move at a time
+                "move": move_data,
+                "log": game_state['log'][log_start:],
+                # The client replays the chain at this pace; the server doesn't wait
+                "timestamp_offset_ms": AI_MOVE_PACING_MS * len(ai_moves)
+            })
             
         except Exception as e:
             print(f"Error processing AI move for {current_player_id}: {e}")
             break
 
+    if ai_moves:
+        game_store.set_fields(game_id, {"game_state": game_state})
+    elif message_type is None:
+        return
+
+    # One write and one broadcast for the whole chain
+    extra = {"ai_moves": ai_moves} if ai_moves else {}
+    await broadcast_game_state(game_id, game_type, game_state, message_type or "state_update", players, **extra)
+
 # --- WebSocket Endpoint (Main Game) ---
 @app.websocket("/ws/game/{game_id}/{player_id}")
 async def websocket_endpoint(websocket: WebSocket, game_id: str, player_id: str):
     
     # --- 1. Connection ---
-    game = await games_collection.find_one({"_id": game_id})
+    game = await game_store.get(game_id)
     if not game:
         await websocket.close(code=1008); return
     
-    player_ids = [p['player_id'] for p in game['players']]
-    if player_id not in player_ids:
-        await websocket.close(code=1008); return
+    member_ids = {p['player_id'] for p in game['players']}
+    if player_id not in member_ids:
+        await websocket.close(code=1008)
+        # get() may just have cached it for this rejected socket
+        await evict_if_idle(game_id); return
 
     await manager.connect(websocket, game_id, player_id)
     print(f"Player {player_id} connected to game {game_id}.")
@@ -319,18 +728,14 @@ async def websocket_endpoint(websocket: WebSocket, game_id: str, player_id: str)
     sanitized_state = sanitize_game_state_for_player(game['game_type'], game['game_state'], player_id)
     
     # Mark AI players in the player list
-    players_with_ai_status = []
-    for p in game['players']:
-        player_dict = p.copy()
-        player_dict['isAI'] = is_ai_player(game_id, p['player_id'])
-        players_with_ai_status.append(player_dict)
+    players_with_ai_status = get_players_with_ai_status(game_id, game['players'])
     
-    await websocket.send_json({
+    await manager.send_to_player(game_id, player_id, encode_message({
         "type": "connection_success",
         "game_state": sanitized_state,
         "players": players_with_ai_status,
         "game_type": game['game_type']
-    })
+    }))
     await manager.broadcast_to_game(game_id, {
         "type": "player_connected",
         "player_id": player_id
@@ -339,170 +744,120 @@ async def websocket_endpoint(websocket: WebSocket, game_id: str, player_id: str)
     try:
         # --- 2. Message Loop ---
         while True:
-            data = await websocket.receive_json()
+            data = orjson.loads(await websocket.receive_text())
             action_type = data.get('type')
             
-            # --- Get fresh game doc for every action ---
-            current_game = await games_collection.find_one({"_id": game_id})
-            logic_module = GAME_LOGIC_MODULES.get(current_game['game_type'])
-            if not logic_module:
-                 await manager.send_to_player(game_id, player_id, {"type": "error", "message": "Unknown game type."})
-                 continue
-            
-            if action_type == 'start_game':
-                if current_game['host_id'] != player_id:
-                    await manager.send_to_player(game_id, player_id, {"type": "error", "message": "Only the host can start."})
-                    continue
-                
-                player_ids = [p['player_id'] for p in current_game['players']]
-                current_count = len(player_ids)
-                ai_needed = get_ai_players_needed(current_game['game_type'], current_count)
-                
-                # Auto-fill AI players to fill all missing slots
-                if ai_needed > 0:
-                    ai_players = []
-                    for _ in range(ai_needed):
-                        ai_player_id = generate_player_id()
-                        ai_players.append({"player_id": ai_player_id})
-                        player_ids.append(ai_player_id)
-                    
-                    # Add AI players to the game document
-                    await games_collection.update_one(
-                        {"_id": game_id},
-                        {"$push": {"players": {"$each": ai_players}}}
-                    )
-                    
-                    # Notify all players that AI players joined
-                    for ai_player in ai_players:
-                        await manager.broadcast_to_game(game_id, {
-                            "type": "player_joined",
-                            "player_id": ai_player["player_id"]
-                        })
-                    
-                    # Refresh game document to get updated player list
-                    current_game = await games_collection.find_one({"_id": game_id})
-                    print(f"Auto-filled {ai_needed} AI player(s) to complete the game (now {len(player_ids)} total players)")
-                
-                try:
-                    game_mode = current_game.get('game_mode', 'classic')
-                    print(f"Starting {current_game['game_type']} game {game_id} with {len(player_ids)} players (mode: {game_mode})...")
-                    if current_game['game_type'] == 'dominoes':
-                        initial_state = logic_module.create_new_game(player_ids, game_mode)
-                    else:  # blackjack
-                        blackjack_mode = game_mode if game_mode in ['best_of_5', 'best_of_10'] else 'best_of_5'
-                        initial_state = logic_module.create_new_game(player_ids, blackjack_mode)
-                    
-                    await games_collection.update_one(
-                        {"_id": game_id},
-                        {"$set": {"game_state": initial_state, "status": "in_progress"}}
-                    )
-                    
-                    # Broadcast new state to all players with updated player list
-                    current_game = await games_collection.find_one({"_id": game_id})
-                    players_with_ai_status = []
-                    for p in current_game['players']:
-                        player_dict = p.copy()
-                        player_dict['isAI'] = is_ai_player(game_id, p['player_id'])
-                        players_with_ai_status.append(player_dict)
-                    
-                    for pid in player_ids:
-                        sanitized = sanitize_game_state_for_player(current_game['game_type'], initial_state, pid)
-                        await manager.send_to_player(game_id, pid, {
-                            "type": "game_started",
-                            "game_state": sanitized,
-                            "players": players_with_ai_status
-                        })
-                    
-                    # Process AI moves if the first player is an AI
-                    await process_ai_moves(game_id, current_game['game_type'], initial_state)
-                except ValueError as e:
-                    error_msg = str(e)
-                    await manager.send_to_player(game_id, player_id, {"type": "error", "message": error_msg})
-                    print(f"Error starting game: {error_msg}")
-                except Exception as e:
-                    error_msg = f"Failed to start game: {str(e)}"
-                    await manager.send_to_player(game_id, player_id, {"type": "error", "message": error_msg})
-                    print(f"Unexpected error starting game: {e}")
-            
-            elif action_type == 'make_move':
-                try:
-                    new_state = logic_module.play_move(
-                        current_game['game_state'], 
-                        player_id, 
-                        data['move_data']
-                    )
-                    
-                    await games_collection.update_one(
-                        {"_id": game_id},
-                        {"$set": {"game_state": new_state}}
-                    )
-
-                    # Broadcast new state to all with updated player list
-                    current_game = await games_collection.find_one({"_id": game_id})
-                    players_with_ai_status = []
-                    for p in current_game['players']:
-                        player_dict = p.copy()
-                        player_dict['isAI'] = is_ai_player(game_id, p['player_id'])
-                        players_with_ai_status.append(player_dict)
-                    
-                    for pid in new_state['players']:
-                        sanitized = sanitize_game_state_for_player(current_game['game_type'], new_state, pid)
-                        await manager.send_to_player(game_id, pid, {
-                            "type": "state_update",
-                            "game_state": sanitized,
-                            "players": players_with_ai_status
-                        })
-                    
-                    # If round finished, auto-mark AI players as ready immediately
-                    if current_game['game_type'] == 'blackjack' and new_state.get('status') == 'round_finished':
-                        if 'ready_for_next_round' not in new_state:
-                            new_state['ready_for_next_round'] = {}
-                        
-                        all_players = new_state['players']
-                        ai_ready_count = 0
-                        for pid in all_players:
-                            if is_ai_player(game_id, pid):
-                                new_state['ready_for_next_round'][pid] = True
-                                ai_ready_count += 1
-                        
-                        if ai_ready_count > 0:
-                            new_state['log'].append(f"✓ {ai_ready_count} AI player(s) automatically ready for next round")
-                            
-                            await games_collection.update_one(
-                                {"_id": game_id},
-                                {"$set": {"game_state": new_state}}
-                            )
-                            
-                            # Broadcast updated state with AI ready
-                            current_game = await games_collection.find_one({"_id": game_id})
-                            players_with_ai_status = []
-                            for p in current_game['players']:
-                                player_dict = p.copy()
-                                player_dict['isAI'] = is_ai_player(game_id, p['player_id'])
-                                players_with_ai_status.append(player_dict)
-                            
+            # --- One action at a time per game, against the in-memory doc ---
+            async with game_store.lock(game_id):
+                current_game = await game_store.get(game_id)
+                # game_type never changes after creation; bind it once per action
+                game_type = current_game['game_type']
+                logic_module = GAME_LOGIC_MODULES.get(game_type)
+                if not logic_module:
+                     await manager.send_to_player(game_id, player_id, {"type": "error", "message": "Unknown game type."})
+                     continue
+
+                if action_type == 'start_game':
+                    if current_game['host_id'] != player_id:
+                        await manager.send_to_player(game_id, player_id, {"type": "error", "message": "Only the host can start."})
+                        continue
+
+                    player_ids = [p['player_id'] for p in current_game['players']]
+                    current_count = len(player_ids)
+                    ai_needed = get_ai_players_needed(game_type, current_count)
+
+                    # Auto-fill AI players to fill all missing slots
+                    if ai_needed > 0:
+                        ai_players = []
+                        for _ in range(ai_needed):
+                            ai_player_id = generate_player_id()
+                            ai_players.append({"player_id": ai_player_id})
+                            player_ids.append(ai_player_id)
+
+                        # Add AI players to the game document
+                        game_store.push_players(game_id, ai_players)
+
+                        # Notify all players that AI players joined
+                        for ai_player in ai_players:
+                            await manager.broadcast_to_game(game_id, {
+                                "type": "player_joined",
+                                "player_id": ai_player["player_id"]
+                            })
+
+                        print(f"Auto-filled {ai_needed} AI player(s) to complete the game (now {len(player_ids)} total players)")
+
+                    try:
+                        game_mode = current_game.get('game_mode', 'classic')
+                        print(f"Starting {game_type} game {game_id} with {len(player_ids)} players (mode: {game_mode})...")
+                        if game_type == 'dominoes':
+                            initial_state = logic_module.create_new_game(player_ids, game_mode)
+                        else:  # blackjack
+                            blackjack_mode = game_mode if game_mode in ['best_of_5', 'best_of_10'] else 'best_of_5'
+                            initial_state = logic_module.create_new_game(player_ids, blackjack_mode)
+
+                        game_store.set_fields(game_id, {"game_state": initial_state, "status": "in_progress"})
+
+                        # Broadcast new state to all players with updated player list
+                        players_with_ai_status = get_players_with_ai_status(game_id, current_game['players'])
+
+                        # Process AI moves if the first player is an AI; the resulting state goes out as game_started
+                        await process_ai_moves(game_id, game_type, initial_state, players_with_ai_status, "game_started")
+                    except ValueError as e:
+                        error_msg = str(e)
+                        await manager.send_to_player(game_id, player_id, {"type": "error", "message": error_msg})
+                        print(f"Error starting game: {error_msg}")
+                    except Exception as e:
+                        error_msg = f"Failed to start game: {str(e)}"
+                        await manager.send_to_player(game_id, player_id, {"type": "error", "message": error_msg})
+                        print(f"Unexpected error starting game: {e}")
+
+                elif action_type == 'make_move':
+                    try:
+                        new_state = logic_module.play_move(
+                            current_game['game_state'], 
+                            player_id, 
+                            data['move_data']
+                        )
+
+                        # If round finished, auto-mark AI players as ready before anyone sees it
+                        round_finished = game_type == 'blackjack' and new_state.get('status') == 'round_finished'
+                        if round_finished:
+                            if 'ready_for_next_round' not in new_state:
+                                new_state['ready_for_next_round'] = {}
+
+                            all_players = new_state['players']
+                            ai_ready_count = 0
                             for pid in all_players:
-                                sanitized = sanitize_game_state_for_player(current_game['game_type'], new_state, pid)
-                                await manager.send_to_player(game_id, pid, {
-                                    "type": "state_update",
-                                    "game_state": sanitized,
-                                    "players": players_with_ai_status
-                                })
-                            
+                                if is_ai_player(game_id, pid):
+                                    new_state['ready_for_next_round'][pid] = True
+                                    ai_ready_count += 1
+
+                            if ai_ready_count > 0:
+                                new_state['log'].append(f"✓ {ai_ready_count} AI player(s) automatically ready for next round")
+
+                        game_store.set_fields(game_id, {"game_state": new_state})
+
+                        players_with_ai_status = get_players_with_ai_status(game_id, current_game['players'])
+
+                        if round_finished:
+                            # Broadcast the finished round, AI ready marks included
+                            await broadcast_game_state(game_id, game_type, new_state, "state_update", players_with_ai_status)
+
                             # Check if all players are ready (including AI)
                             ready_count = len(new_state['ready_for_next_round'])
                             total_players = len(all_players)
-                            
+
                             if ready_count >= total_players:
                                 # All players ready, start next round immediately
-                                await asyncio.sleep(0.5)  # Brief pause
-                                
+                                # Start the brief pause now and build/save the next state while it runs
+                                pause = asyncio.create_task(asyncio.sleep(0.5))
+
                                 # Create new round
                                 player_ids = new_state['players']
                                 game_mode = new_state.get('game_mode', 'best_of_5')
                                 next_round_number = new_state.get('round_number', 1) + 1
                                 next_round_state = logic_module.create_new_game(player_ids, game_mode)
-                                
+
                                 # Preserve game-level state
                                 next_round_state['hand_wins'] = new_state.get('hand_wins', {})
                                 next_round_state['round_number'] = next_round_number
@@ -510,325 +865,172 @@ async def websocket_endpoint(websocket: WebSocket, game_id: str, player_id: str)
                                 next_round_state['game_mode'] = game_mode
                                 next_round_state['wins_needed'] = new_state.get('wins_needed', 3)
                                 next_round_state['log'] = [f"🔄 Starting Round #{next_round_number}..."] + next_round_state['log']
-                                
-                                await games_collection.update_one(
-                                    {"_id": game_id},
-                                    {"$set": {"game_state": next_round_state}}
-                                )
-                                
-                                # Broadcast new round state
-                                current_game = await games_collection.find_one({"_id": game_id})
-                                players_with_ai_status = []
-                                for p in current_game['players']:
-                                    player_dict = p.copy()
-                                    player_dict['isAI'] = is_ai_player(game_id, p['player_id'])
-                                    players_with_ai_status.append(player_dict)
-                                
-                                for pid in player_ids:
-                                    sanitized = sanitize_game_state_for_player(current_game['game_type'], next_round_state, pid)
-                                    await manager.send_to_player(game_id, pid, {
-                                        "type": "state_update",
-                                        "game_state": sanitized,
-                                        "players": players_with_ai_status
-                                    })
-                                
-                                # Process AI moves if needed
-                                await process_ai_moves(game_id, current_game['game_type'], next_round_state)
-                                continue  # Skip processing AI moves for the finished round
-                    
-                    # Process AI moves until it's a human player's turn or game ends
-                    await process_ai_moves(game_id, current_game['game_type'], new_state)
-                except ValueError as e:
-                    await manager.send_to_player(game_id, player_id, {"type": "error", "message": str(e)})
-                except Exception as e:
-                    error_msg = f"Failed to process move: {str(e)}"
-                    await manager.send_to_player(game_id, player_id, {"type": "error", "message": error_msg})
-                    print(f"Unexpected error processing move: {e}")
-            
-            elif action_type == 'ready_for_next_round':
-                # Player is ready for next round (blackjack only)
-                if current_game['game_type'] != 'blackjack':
-                    await manager.send_to_player(game_id, player_id, {"type": "error", "message": "This action is only for blackjack."})
-                    continue
-                
-                game_state = current_game['game_state']
-                if game_state.get('status') != 'round_finished':
-                    await manager.send_to_player(game_id, player_id, {"type": "error", "message": "No round is finished."})
-                    continue
-                
-                # Mark player as ready
-                if 'ready_for_next_round' not in game_state:
-                    game_state['ready_for_next_round'] = {}
-                
-                game_state['ready_for_next_round'][player_id] = True
-                
-                # Check if all players are ready
-                all_players = game_state['players']
-                
-                # Auto-mark ALL AI players as ready immediately (not just after human clicks)
-                ai_ready_count = 0
-                for pid in all_players:
-                    if is_ai_player(game_id, pid) and pid not in game_state['ready_for_next_round']:
-                        game_state['ready_for_next_round'][pid] = True
-                        ai_ready_count += 1
-                
-                if ai_ready_count > 0:
-                    game_state['log'].append(f"✓ {ai_ready_count} AI player(s) automatically ready for next round")
-                
-                ready_count = len(game_state['ready_for_next_round'])
-                total_players = len(all_players)
-                
-                game_state['log'].append(f"✓ Player is ready for next round ({ready_count}/{total_players})")
-                
-                await games_collection.update_one(
-                    {"_id": game_id},
-                    {"$set": {"game_state": game_state}}
-                )
-                
-                # Broadcast updated state
-                current_game = await games_collection.find_one({"_id": game_id})
-                players_with_ai_status = []
-                for p in current_game['players']:
-                    player_dict = p.copy()
-                    player_dict['isAI'] = is_ai_player(game_id, p['player_id'])
-                    players_with_ai_status.append(player_dict)
-                
-                for pid in all_players:
-                    sanitized = sanitize_game_state_for_player(current_game['game_type'], game_state, pid)
-                    await manager.send_to_player(game_id, pid, {
-                        "type": "state_update",
-                        "game_state": sanitized,
-                        "players": players_with_ai_status
-                    })
-                
-                # Check if all players are ready now (including AI)
-                ready_count = len(game_state['ready_for_next_round'])
-                
-                if ready_count >= total_players:
-                    # Update database with AI ready status
-                    await games_collection.update_one(
-                        {"_id": game_id},
-                        {"$set": {"game_state": game_state}}
-                    )
-                    
-                    # Broadcast updated state
-                    current_game = await games_collection.find_one({"_id": game_id})
-                    players_with_ai_status = []
-                    for p in current_game['players']:
-                        player_dict = p.copy()
-                        player_dict['isAI'] = is_ai_player(game_id, p['player_id'])
-                        players_with_ai_status.append(player_dict)
-                    
+
+                                game_store.set_fields(game_id, {"game_state": next_round_state})
+
+                                await pause
+
+                                # Broadcast new round state, after any AI moves it opens with
+                                await process_ai_moves(game_id, game_type, next_round_state, players_with_ai_status, "state_update")
+                            continue  # No AI moves in a finished round
+
+                        # Broadcast new state to all, after any AI moves that follow it
+                        await process_ai_moves(game_id, game_type, new_state, players_with_ai_status, "state_update")
+                    except ValueError as e:
+                        await manager.send_to_player(game_id, player_id, {"type": "error", "message": str(e)})
+                    except Exception as e:
+                        error_msg = f"Failed to process move: {str(e)}"
+                        await manager.send_to_player(game_id, player_id, {"type": "error", "message": error_msg})
+                        print(f"Unexpected error processing move: {e}")
+
+                elif action_type == 'ready_for_next_round':
+                    # Player is ready for next round (blackjack only)
+                    if game_type != 'blackjack':
+                        await manager.send_to_player(game_id, player_id, {"type": "error", "message": "This action is only for blackjack."})
+                        continue
+
+                    game_state = current_game['game_state']
+                    if game_state.get('status') != 'round_finished':
+                        await manager.send_to_player(game_id, player_id, {"type": "error", "message": "No round is finished."})
+                        continue
+
+                    # Mark player as ready
+                    if 'ready_for_next_round' not in game_state:
+                        game_state['ready_for_next_round'] = {}
+
+                    game_state['ready_for_next_round'][player_id] = True
+                    newly_ready = [player_id]
+                    log_start = len(game_state['log'])
+
+                    # Check if all players are ready
+                    all_players = game_state['players']
+
+                    # Auto-mark ALL AI players as ready immediately (not just after human clicks)
+                    ai_ready_count = 0
                     for pid in all_players:
-                        sanitized = sanitize_game_state_for_player(current_game['game_type'], game_state, pid)
-                        await manager.send_to_player(game_id, pid, {
-                            "type": "state_update",
-                            "game_state": sanitized,
-                            "players": players_with_ai_status
-                        })
-                    
-                    await asyncio.sleep(0.5)  # Brief pause
-                    
-                    # Create new round
-                    player_ids = game_state['players']
-                    game_mode = game_state.get('game_mode', 'best_of_5')
-                    next_round_number = game_state.get('round_number', 1) + 1
-                    next_round_state = logic_module.create_new_game(player_ids, game_mode)
-                    
-                    # Preserve game-level state
-                    next_round_state['hand_wins'] = game_state.get('hand_wins', {})
-                    next_round_state['round_number'] = next_round_number
-                    next_round_state['scores'] = game_state.get('scores', {})
-                    next_round_state['game_mode'] = game_mode
-                    next_round_state['wins_needed'] = game_state.get('wins_needed', 3)
-                    next_round_state['log'] = [f"🔄 Starting Round #{next_round_number}..."] + next_round_state['log']
-                    
-                    await games_collection.update_one(
-                        {"_id": game_id},
-                        {"$set": {"game_state": next_round_state}}
-                    )
-                    
-                    # Broadcast new round state
-                    current_game = await games_collection.find_one({"_id": game_id})
-                    players_with_ai_status = []
-                    for p in current_game['players']:
-                        player_dict = p.copy()
-                        player_dict['isAI'] = is_ai_player(game_id, p['player_id'])
-                        players_with_ai_status.append(player_dict)
-                    
-                    for pid in player_ids:
-                        sanitized = sanitize_game_state_for_player(current_game['game_type'], next_round_state, pid)
-                        await manager.send_to_player(game_id, pid, {
-                            "type": "state_update",
-                            "game_state": sanitized,
-                            "players": players_with_ai_status
-                        })
-                    
-                    # Process AI moves if needed
-                    await process_ai_moves(game_id, current_game['game_type'], next_round_state)
-            
-            elif action_type == 'ready_for_next_hand':
-                # Player is ready for next hand (dominoes only)
-                if current_game['game_type'] != 'dominoes':
-                    await manager.send_to_player(game_id, player_id, {"type": "error", "message": "This action is only for dominoes."})
-                    continue
-                
-                game_state = current_game['game_state']
-                if game_state.get('status') != 'hand_finished':
-                    await manager.send_to_player(game_id, player_id, {"type": "error", "message": "No hand is finished."})
-                    continue
-                
-                # Mark player as ready
-                if 'ready_for_next_hand' not in game_state:
-                    game_state['ready_for_next_hand'] = {}
-                
-                game_state['ready_for_next_hand'][player_id] = True
-                
-                # Check if all players are ready
-                all_players = game_state['players']
-                ready_count = len(game_state['ready_for_next_hand'])
-                total_players = len(all_players)
-                
-                game_state['log'].append(f"✓ {player_id} is ready for next hand ({ready_count}/{total_players})")
-                
-                await games_collection.update_one(
-                    {"_id": game_id},
-                    {"$set": {"game_state": game_state}}
-                )
-                
-                # Broadcast updated state
-                current_game = await games_collection.find_one({"_id": game_id})
-                players_with_ai_status = []
-                for p in current_game['players']:
-                    player_dict = p.copy()
-                    player_dict['isAI'] = is_ai_player(game_id, p['player_id'])
-                    players_with_ai_status.append(player_dict)
-                
-                for pid in all_players:
-                    sanitized = sanitize_game_state_for_player(current_game['game_type'], game_state, pid)
-                    await manager.send_to_player(game_id, pid, {
-                        "type": "state_update",
-                        "game_state": sanitized,
-                        "players": players_with_ai_status
-                    })
-                
-                # Auto-mark AI players as ready
-                for pid in all_players:
-                    if is_ai_player(game_id, pid) and pid not in game_state['ready_for_next_hand']:
-                        game_state['ready_for_next_hand'][pid] = True
-                        game_state['log'].append(f"✓ {pid} (AI) is ready for next hand")
-                
-                # Update ready count after AI auto-ready
-                ready_count = len(game_state['ready_for_next_hand'])
-                
-                if ready_count >= total_players:
-                    # Update database with AI ready status
-                    await games_collection.update_one(
-                        {"_id": game_id},
-                        {"$set": {"game_state": game_state}}
-                    )
-                    
+                        if is_ai_player(game_id, pid) and pid not in game_state['ready_for_next_round']:
+                            game_state['ready_for_next_round'][pid] = True
+                            newly_ready.append(pid)
+                            ai_ready_count += 1
+
+                    if ai_ready_count > 0:
+                        game_state['log'].append(f"✓ {ai_ready_count} AI player(s) automatically ready for next round")
+
+                    ready_count = len(game_state['ready_for_next_round'])
+                    total_players = len(all_players)
+
+                    game_state['log'].append(f"✓ Player is ready for next round ({ready_count}/{total_players})")
+
+                    save_ready_marks(game_id, game_state, 'ready_for_next_round', newly_ready, log_start)
+
                     # Broadcast updated state
-                    current_game = await games_collection.find_one({"_id": game_id})
-                    players_with_ai_status = []
-                    for p in current_game['players']:
-                        player_dict = p.copy()
-                        player_dict['isAI'] = is_ai_player(game_id, p['player_id'])
-                        players_with_ai_status.append(player_dict)
-                    
+                    players_with_ai_status = get_players_with_ai_status(game_id, current_game['players'])
+
+                    await broadcast_game_state(game_id, game_type, game_state, "state_update", players_with_ai_status)
+
+                    # AI players were marked above, so the state just sent is final
+                    if ready_count >= total_players:
+                        # Start the brief pause now and build/save the next state while it runs
+                        pause = asyncio.create_task(asyncio.sleep(0.5))
+
+                        # Create new round
+                        player_ids = game_state['players']
+                        game_mode = game_state.get('game_mode', 'best_of_5')
+                        next_round_number = game_state.get('round_number', 1) + 1
+                        next_round_state = logic_module.create_new_game(player_ids, game_mode)
+
+                        # Preserve game-level state
+                        next_round_state['hand_wins'] = game_state.get('hand_wins', {})
+                        next_round_state['round_number'] = next_round_number
+                        next_round_state['scores'] = game_state.get('scores', {})
+                        next_round_state['game_mode'] = game_mode
+                        next_round_state['wins_needed'] = game_state.get('wins_needed', 3)
+                        next_round_state['log'] = [f"🔄 Starting Round #{next_round_number}..."] + next_round_state['log']
+
+                        game_store.set_fields(game_id, {"game_state": next_round_state})
+
+                        await pause
+
+                        # Broadcast new round state, after any AI moves it opens with
+                        await process_ai_moves(game_id, game_type, next_round_state, players_with_ai_status, "state_update")
+
+                elif action_type == 'ready_for_next_hand':
+                    # Player is ready for next hand (dominoes only)
+                    if game_type != 'dominoes':
+                        await manager.send_to_player(game_id, player_id, {"type": "error", "message": "This action is only for dominoes."})
+                        continue
+
+                    game_state = current_game['game_state']
+                    if game_state.get('status') != 'hand_finished':
+                        await manager.send_to_player(game_id, player_id, {"type": "error", "message": "No hand is finished."})
+                        continue
+
+                    # Mark player as ready
+                    if 'ready_for_next_hand' not in game_state:
+                        game_state['ready_for_next_hand'] = {}
+
+                    game_state['ready_for_next_hand'][player_id] = True
+                    newly_ready = [player_id]
+                    log_start = len(game_state['log'])
+
+                    # Check if all players are ready
+                    all_players = game_state['players']
+                    ready_count = len(game_state['ready_for_next_hand'])
+                    total_players = len(all_players)
+
+                    game_state['log'].append(f"✓ {player_id} is ready for next hand ({ready_count}/{total_players})")
+
+                    # Auto-mark AI players as ready before saving, so one write covers both
                     for pid in all_players:
-                        sanitized = sanitize_game_state_for_player(current_game['game_type'], game_state, pid)
-                        await manager.send_to_player(game_id, pid, {
-                            "type": "state_update",
-                            "game_state": sanitized,
-                            "players": players_with_ai_status
-                        })
-                    
-                    await asyncio.sleep(0.5)  # Brief pause
-                    
-                    # Create new hand
-                    player_ids = game_state['players']
-                    game_mode = game_state.get('game_mode', 'classic')
-                    current_hand_num = game_state.get('hand_number', 1)
-                    next_hand_number = current_hand_num + 1 if game_mode == 'classic' else game_state.get('hand_number', 2)
-                    
-                    # Check if we need to set a specific starter (from deadlock tie)
-                    next_hand_starter = game_state.get('next_hand_starter')
-                    
-                    next_hand_state = logic_module.create_new_game(player_ids, game_mode)
-                    
-                    # If next_hand_starter is set (from deadlock tie), override the starting player
-                    if next_hand_starter and game_mode == "boricua" and next_hand_state.get('teams'):
-                        teams = next_hand_state['teams']
-                        if next_hand_starter in teams:
-                            # Set the first player of the specified team as starter
-                            starting_team_players = teams[next_hand_starter]
-                            if starting_team_players:
-                                # Find the starting player from that team
-                                start_player_id = starting_team_players[0]
-                                # Find highest double in that team's hands
-                                start_tile = None
-                                for double in range(6, -1, -1):
-                                    tile = (double, double)
-                                    for player_id in starting_team_players:
-                                        if tile in next_hand_state['hands'][player_id]:
-                                            start_player_id = player_id
-                                            start_tile = tile
-                                            break
-                                    if start_tile:
-                                        break
-                                
-                                # If no double, find highest pip tile in that team
-                                if not start_tile:
-                                    max_pips = -1
-                                    for player_id in starting_team_players:
-                                        for tile in next_hand_state['hands'][player_id]:
-                                            if sum(tile) > max_pips:
-                                                max_pips = sum(tile)
-                                                start_player_id = player_id
-                                
-                                # Update the game state to start with this player
-                                next_hand_state['current_turn_index'] = player_ids.index(start_player_id)
-                                
-                                # If a starting tile was found, play it
-                                if start_tile:
-                                    next_hand_state['board'].append(start_tile)
-                                    next_hand_state['hands'][start_player_id].remove(start_tile)
-                                    next_hand_state['current_turn_index'] = (next_hand_state['current_turn_index'] + 1) % len(player_ids)
-                                    next_hand_state['last_tile_played'] = start_tile
-                                    next_hand_state['log'].append(f"{start_player_id} started with {start_tile} (team who started previous hand).")
-                    
-                    # Preserve game-level state
-                    next_hand_state['hand_wins'] = game_state.get('hand_wins', {})
-                    next_hand_state['hand_number'] = next_hand_number
-                    next_hand_state['scores'] = game_state.get('scores', {})
-                    next_hand_state['teams'] = game_state.get('teams')
-                    next_hand_state['team_scores'] = game_state.get('team_scores')
-                    next_hand_state['log'] = [f"🔄 Starting Hand #{next_hand_number}..."] + next_hand_state['log']
-                    
-                    await games_collection.update_one(
-                        {"_id": game_id},
-                        {"$set": {"game_state": next_hand_state}}
-                    )
-                    
-                    # Broadcast new hand state
-                    current_game = await games_collection.find_one({"_id": game_id})
-                    players_with_ai_status = []
-                    for p in current_game['players']:
-                        player_dict = p.copy()
-                        player_dict['isAI'] = is_ai_player(game_id, p['player_id'])
-                        players_with_ai_status.append(player_dict)
-                    
-                    for pid in player_ids:
-                        sanitized = sanitize_game_state_for_player(current_game['game_type'], next_hand_state, pid)
-                        await manager.send_to_player(game_id, pid, {
-                            "type": "state_update",
-                            "game_state": sanitized,
-                            "players": players_with_ai_status
-                        })
-                    
-                    # Process AI moves if needed
-                    await process_ai_moves(game_id, current_game['game_type'], next_hand_state)
+                        if is_ai_player(game_id, pid) and pid not in game_state['ready_for_next_hand']:
+                            game_state['ready_for_next_hand'][pid] = True
+                            newly_ready.append(pid)
+                            game_state['log'].append(f"✓ {pid} (AI) is ready for next hand")
+
+                    # Update ready count after AI auto-ready
+                    ready_count = len(game_state['ready_for_next_hand'])
+
+                    save_ready_marks(game_id, game_state, 'ready_for_next_hand', newly_ready, log_start)
+
+                    # Broadcast updated state
+                    players_with_ai_status = get_players_with_ai_status(game_id, current_game['players'])
+
+                    await broadcast_game_state(game_id, game_type, game_state, "state_update", players_with_ai_status)
+
+                    if ready_count >= total_players:
+                        # Start the brief pause now and build/save the next state while it runs
+                        pause = asyncio.create_task(asyncio.sleep(0.5))
+
+                        # Create new hand
+                        player_ids = game_state['players']
+                        game_mode = game_state.get('game_mode', 'classic')
+                        current_hand_num = game_state.get('hand_number', 1)
+                        next_hand_number = current_hand_num + 1 if game_mode == 'classic' else game_state.get('hand_number', 2)
+
+                        # Check if we need to set a specific starter (from deadlock tie)
+                        next_hand_starter = game_state.get('next_hand_starter')
+
+                        teams = game_state.get('teams')
+                        if next_hand_starter and game_mode == "boricua" and teams and teams.get(next_hand_starter):
+                            next_hand_state = logic_module.create_new_game(player_ids, game_mode, starting_players=teams[next_hand_starter])
+                            next_hand_state['log'].append(f"{next_hand_state['starting_player_id']} starts (team who started previous hand).")
+                        else:
+                            next_hand_state = logic_module.create_new_game(player_ids, game_mode)
+
+                        # Preserve game-level state
+                        next_hand_state['hand_wins'] = game_state.get('hand_wins', {})
+                        next_hand_state['hand_number'] = next_hand_number
+                        next_hand_state['scores'] = game_state.get('scores', {})
+                        next_hand_state['teams'] = game_state.get('teams')
+                        next_hand_state['team_scores'] = game_state.get('team_scores')
+                        next_hand_state['log'] = [f"🔄 Starting Hand #{next_hand_number}..."] + next_hand_state['log']
+
+                        game_store.set_fields(game_id, {"game_state": next_hand_state})
+
+                        await pause
+
+                        # Broadcast new hand state, after any AI moves it opens with
+                        await process_ai_moves(game_id, game_type, next_hand_state, players_with_ai_status, "state_update")
 
     except WebSocketDisconnect:
         print(f"Player {player_id} disconnected from game {game_id}.")
@@ -837,6 +1039,8 @@ async def websocket_endpoint(websocket: WebSocket, game_id: str, player_id: str)
             "type": "player_disconnected",
             "player_id": player_id
         })
+        # Nobody left to serve: let the next connection reload it from MongoDB
+        await evict_if_idle(game_id)
 
 # --- Serve Frontend ---
 app.mount("/static", StaticFiles(directory="../frontend"), name="static")
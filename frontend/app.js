@@ -297,23 +297,22 @@ document.addEventListener('DOMContentLoaded', () => {
                     break;
                 case 'game_started':
                 case 'state_update':
+                    // Log deltas: keep what we already have up to log_start, add the tail
+                    if (data.log_tail && data.game_state) {
+                        const previousLog = (currentGameState && currentGameState.log) || [];
+                        data.game_state.log = previousLog.slice(0, data.log_start).concat(data.log_tail);
+                    }
                     currentGameState = data.game_state;
                     // Update players list if provided
                     if (data.players) {
                         renderPlayers(data.players);
                     }
-                    renderGame(data.game_state);
-                    // Update drop zones with new ends
-                    if (data.game_state && data.game_state.board) {
-                        const leftEndDisplay = document.getElementById('left-end-display');
-                        const rightEndDisplay = document.getElementById('right-end-display');
-                        if (data.game_state.board.length > 0) {
-                            if (leftEndDisplay) leftEndDisplay.textContent = data.game_state.board[0][0];
-                            if (rightEndDisplay) rightEndDisplay.textContent = data.game_state.board[data.game_state.board.length - 1][1];
-                        } else {
-                            if (leftEndDisplay) leftEndDisplay.textContent = '-';
-                            if (rightEndDisplay) rightEndDisplay.textContent = '-';
-                        }
+                    // A chain of AI moves arrives as one update; replay it move by move
+                    if (data.ai_moves && data.ai_moves.length > 0) {
+                        paceAiMoves(data.game_state, data.ai_moves);
+                    } else {
+                        renderGame(data.game_state);
+                        renderOpenEnds(data.game_state);
                     }
                     break;
                 case 'error':
@@ -624,6 +623,95 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     }
     
+    // Replays a batched AI chain one move at a time, using the offsets the
+    // server sent. Each step shows the table as it was right after that move,
+    // rebuilt by undoing the later moves on the final state. Stops if a newer
+    // state has arrived.
+    function paceAiMoves(state, aiMoves) {
+        const log = state.log || [];
+        let shown = log.length;
+        // frames[i] is the state right after aiMoves[i]; the last one is the final state
+        const frames = [state];
+        for (let i = aiMoves.length - 1; i > 0; i--) {
+            shown -= aiMoves[i].log.length;
+            frames.unshift(undoAiMove(frames[0], aiMoves[i], Math.max(shown, 0)));
+        }
+        frames.forEach((frame, i) => {
+            const show = () => {
+                if (currentGameState !== state) return;
+                renderGame(frame);
+                renderOpenEnds(frame);
+            };
+            if (i === 0) show(); else setTimeout(show, aiMoves[i].timestamp_offset_ms);
+        });
+    }
+
+    // Returns the state just before one AI move, given the state after it.
+    // Only what the table shows is rolled back: board, hand sizes, pile counts.
+    function undoAiMove(after, entry, logLength) {
+        const move = entry.move || {};
+        const pid = entry.player_id;
+        const before = {
+            ...after,
+            status: 'in_progress',
+            log: (after.log || []).slice(0, logLength),
+            current_turn_index: after.players.indexOf(pid),
+            hands: { ...after.hands }
+        };
+        const hand = after.hands[pid];
+        if (after.board) { // Dominoes
+            if (move.action === 'play') {
+                before.board = move.side === 'left' ? after.board.slice(1) : after.board.slice(0, -1);
+                before.hands[pid] = shiftCount(hand, 1);
+            } else if (move.action === 'draw') {
+                before.hands[pid] = shiftCount(hand, -1);
+                if (typeof after.boneyard_count === 'number') {
+                    before.boneyard_count = after.boneyard_count + 1;
+                    before.boneyard = `${before.boneyard_count} tiles`;
+                }
+            }
+        } else if (after.dealer_hand) { // Blackjack
+            if (hand && typeof hand === 'object') {
+                before.hands[pid] = {
+                    ...hand,
+                    status: 'playing',
+                    hand: move.action === 'hit' ? shiftCount(hand.hand, -1) : hand.hand
+                };
+            }
+            if (move.action === 'hit' && typeof after.deck === 'string') {
+                before.deck = shiftCount(after.deck, 1);
+            }
+            if (after.status !== 'in_progress' && after.dealer_hand.length > 0) {
+                // The dealer only played once everyone was done: hide the hole card again
+                const upCard = after.dealer_hand[0];
+                before.dealer_hand = [upCard, { rank: '?', suit: '' }];
+                before.dealer_value = upCard.rank === 'A' ? 11 : upCard.value;
+            }
+        }
+        return before;
+    }
+
+    // Adjusts a masked "7 tiles" / "3 cards" summary by delta; anything else is returned as-is
+    function shiftCount(summary, delta) {
+        if (typeof summary !== 'string') return summary;
+        const match = summary.match(/^(\d+)(.*)$/);
+        return match ? `${parseInt(match[1], 10) + delta}${match[2]}` : summary;
+    }
+
+    // Updates the drop zones with the board's open ends
+    function renderOpenEnds(state) {
+        if (!state || !state.board) return;
+        const leftEndDisplay = document.getElementById('left-end-display');
+        const rightEndDisplay = document.getElementById('right-end-display');
+        if (state.board.length > 0) {
+            if (leftEndDisplay) leftEndDisplay.textContent = state.board[0][0];
+            if (rightEndDisplay) rightEndDisplay.textContent = state.board[state.board.length - 1][1];
+        } else {
+            if (leftEndDisplay) leftEndDisplay.textContent = '-';
+            if (rightEndDisplay) rightEndDisplay.textContent = '-';
+        }
+    }
+    
     function addLogMessage(message) {
          gameLogDiv.innerHTML = `<p>${message}</p>` + gameLogDiv.innerHTML;
     }